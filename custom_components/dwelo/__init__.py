@@ -2,43 +2,275 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+import logging
+import time
+
+from aiohttp import ClientError
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, HOST
+from .auth import token_from_entry_data, token_to_entry_data
+from .cache import DweloCache
+from .commands import DweloCommandTracker
+from .const import (
+    CONF_SETUP_CONCURRENCY,
+    CONF_STREAM_RESPONSES,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_STREAM_RESPONSES,
+    DISCOVERY_INTERVAL,
+    DOMAIN,
+    HOST,
+)
+from .coordinator import DweloGatewayCoordinator
+from .discovery import DweloDiscovery, async_get_devices, create_coordinators
 from .dwelo_client import DweloClient
-from .models import DweloData
+from .models import DweloData, DweloToken
+from .resilience import RetryPolicy
+from .services import async_setup_services
+from .shared import async_get_shared_data
+
+_LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.LOCK]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
+    Platform.CLIMATE,
+    Platform.LOCK,
+    Platform.SENSOR,
+]
+
+# Setup phases slower than this many seconds are logged as a warning.
+SLOW_SETUP_PHASE = 10.0
+# Background discovery after a cached start is retried until it succeeds.
+DISCOVERY_RETRY_POLICY = RetryPolicy(base_delay=30.0, max_delay=900.0)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Dwelo services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Dwelo Integration from a config entry."""
+    """Set up Dwelo Integration from a config entry.
+
+    Only what is needed to create the entities happens here; the first poll
+    always runs in the background. Without a cache, discovery, and login if
+    there is no stored token, have to succeed first and a failure raises
+    ConfigEntryNotReady, so Home Assistant retries the setup with backoff.
+    """
 
     hass.data.setdefault(DOMAIN, {})
 
     client = DweloClient(
-        HOST, hass, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+        HOST,
+        hass,
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        stream_responses=entry.options.get(
+            CONF_STREAM_RESPONSES, DEFAULT_STREAM_RESPONSES
+        ),
+        rate_limiter=async_get_shared_data(hass).rate_limiter,
+        token=token_from_entry_data(entry.data),
+        token_listener=partial(_async_store_token, hass, entry),
     )
+    concurrency = entry.options.get(CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY)
+    timings: dict[str, float] = {}
 
-    if not await client.login():
-        return False
+    # With a cache the entities are created from the last known state right
+    # away, and login and discovery happen in the background as well.
+    cache = DweloCache(hass, entry.entry_id)
+    if cached := await cache.async_load():
+        device_metadata = cache.device_metadata
+    else:
+        if client.token is None:
+            with _timed_phase(timings, "login"):
+                await _async_login(client)
+        with _timed_phase(timings, "discovery"):
+            device_metadata = await async_get_devices(client)
+        if device_metadata is None:
+            raise ConfigEntryNotReady("Dwelo device discovery failed")
+        cache.async_set_devices(device_metadata)
 
-    hass.data[DOMAIN][entry.entry_id] = DweloData(
+    coordinators = create_coordinators(hass, entry, client, device_metadata)
+    for gateway_id, coordinator in coordinators.items():
+        if cached:
+            coordinator.data = cache.snapshot(gateway_id, coordinator.device_metadata)
+        entry.async_on_unload(cache.async_track(coordinator))
+
+    data = hass.data[DOMAIN][entry.entry_id] = DweloData(
         entry_id=entry.entry_id,
         client=client,
-        device_metadata=await client.get_devices(),
+        device_metadata=device_metadata,
+        coordinators=coordinators,
+        command_tracker=DweloCommandTracker(hass),
+    )
+
+    with _timed_phase(timings, "platforms"):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(
+        entry.add_update_listener(partial(_async_update_listener, dict(entry.options)))
     )
+    _log_timings(entry, timings)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    discovery = DweloDiscovery(hass, entry, data, cache)
+    entry.async_create_background_task(
+        hass,
+        _async_background_setup(entry, data, discovery, concurrency, cached),
+        f"{DOMAIN} background setup {entry.entry_id}",
+    )
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, partial(_async_rediscover, discovery), DISCOVERY_INTERVAL
+        )
+    )
 
     return True
 
 
+@contextmanager
+def _timed_phase(timings: dict[str, float], phase: str) -> Iterator[None]:
+    """Record how long a setup phase took."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[phase] = time.monotonic() - start
+
+
+def _log_timings(entry: ConfigEntry, timings: dict[str, float]) -> None:
+    """Log how long each setup phase took, warning about slow ones."""
+    summary = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+    if any(seconds >= SLOW_SETUP_PHASE for seconds in timings.values()):
+        _LOGGER.warning(f"Slow Dwelo setup of {entry.title}: {summary}")  # noqa: G004
+    else:
+        _LOGGER.debug(f"Dwelo setup of {entry.title}: {summary}")  # noqa: G004
+
+
+async def _async_login(client: DweloClient) -> None:
+    """Log in during setup, asking Home Assistant to retry on failure."""
+    try:
+        logged_in = await client.login()
+    except (ClientError, TimeoutError) as err:
+        raise ConfigEntryNotReady(f"Unable to reach the Dwelo API: {err}") from err
+    if not logged_in:
+        raise ConfigEntryNotReady("Dwelo login failed")
+
+
+async def _async_background_setup(
+    entry: ConfigEntry,
+    data: DweloData,
+    discovery: DweloDiscovery,
+    concurrency: int,
+    cached: bool,
+) -> None:
+    """Run the first poll and, for a cached start, catch up on discovery.
+
+    After a cached start the client logs in lazily, so the first poll includes
+    the login.
+    """
+    timings: dict[str, float] = {}
+    with _timed_phase(timings, "first poll"):
+        await _async_refresh_coordinators(data.coordinators, concurrency)
+    if cached:
+        with _timed_phase(timings, "discovery"):
+            await _async_reconcile(discovery)
+    _log_timings(entry, timings)
+
+
+async def _async_reconcile(discovery: DweloDiscovery) -> None:
+    """Bring an entry that started from the cache up to date.
+
+    Discovery is retried with backoff until it succeeds, while the entities
+    keep running on the cached devices.
+    """
+    retry = 0
+    while not await discovery.async_discover():
+        delay = DISCOVERY_RETRY_POLICY.backoff(retry)
+        retry += 1
+        _LOGGER.warning(
+            f"Keeping the cached Dwelo devices, retrying discovery in {delay:.0f}s"  # noqa: G004
+        )
+        await asyncio.sleep(delay)
+
+
+async def _async_rediscover(discovery: DweloDiscovery, _now: datetime) -> None:
+    """Pick up devices added to or removed from the account."""
+    await discovery.async_discover()
+
+
+@callback
+def _async_store_token(
+    hass: HomeAssistant, entry: ConfigEntry, token: DweloToken
+) -> None:
+    """Keep the latest bearer token in the entry data for the next start."""
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, **token_to_entry_data(token)}
+    )
+
+
+async def _async_update_listener(
+    options: Mapping[str, any], hass: HomeAssistant, entry: ConfigEntry
+) -> None:
+    """Reload the entry when its options change.
+
+    Storing a new token updates the entry data as well, which needs no reload.
+    """
+    if entry.options != options:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_refresh_coordinators(
+    coordinators: dict[str, DweloGatewayCoordinator], concurrency: int
+) -> None:
+    """Run the first refresh of every gateway with bounded parallelism.
+
+    A failing gateway does not hold up the others; its entities start out
+    unavailable and recover on the next successful poll.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _async_refresh(coordinator: DweloGatewayCoordinator) -> None:
+        async with semaphore:
+            await coordinator.async_refresh()
+
+    await asyncio.gather(
+        *(_async_refresh(coordinator) for coordinator in coordinators.values())
+    )
+
+    if failed := [
+        gateway_id
+        for gateway_id, coordinator in coordinators.items()
+        if not coordinator.last_update_success
+    ]:
+        _LOGGER.warning(
+            f"Initial poll failed for {len(failed)} of {len(coordinators)} Dwelo gateways: {failed}"  # noqa: G004
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data: DweloData = hass.data[DOMAIN].pop(entry.entry_id)
+        data.command_tracker.async_shutdown()
+        for coordinator in data.coordinators.values():
+            await coordinator.async_shutdown()
+
+    return unload_ok
+
 
-    return unload_ok
\ No newline at end of file
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cache of a removed config entry."""
+    await DweloCache(hass, entry.entry_id).async_remove()
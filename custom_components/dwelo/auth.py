@@ -0,0 +1,45 @@
+"""Persistence of the Dwelo bearer token in the config entry."""
+
+from collections.abc import Mapping
+import time
+
+from homeassistant.const import CONF_TOKEN
+
+from .const import CONF_TOKEN_ISSUED, CONF_TOKEN_LIFETIME
+from .models import DweloToken
+
+# A stored token is no longer reused once this share of its observed
+# lifetime has passed, so startup does not run into a rejection.
+TOKEN_REUSE_MARGIN = 0.9
+
+
+def token_to_entry_data(token: DweloToken) -> dict[str, any]:
+    """Get the config entry data that stores a token."""
+    return {
+        CONF_TOKEN: token.token,
+        CONF_TOKEN_ISSUED: token.issued_at,
+        CONF_TOKEN_LIFETIME: token.lifetime,
+    }
+
+
+def token_from_entry_data(data: Mapping[str, any]) -> DweloToken | None:
+    """Get the token stored in config entry data, if there is one."""
+    if not (token := data.get(CONF_TOKEN)) or data.get(CONF_TOKEN_ISSUED) is None:
+        return None
+    return DweloToken(
+        token=token,
+        issued_at=data[CONF_TOKEN_ISSUED],
+        lifetime=data.get(CONF_TOKEN_LIFETIME),
+    )
+
+
+def is_token_fresh(token: DweloToken, now: float | None = None) -> bool:
+    """Return True if a token is still worth trying.
+
+    A token whose lifetime is unknown is always tried; if the API rejects it,
+    the client logs in again and learns the lifetime.
+    """
+    if token.lifetime is None:
+        return True
+    age = (time.time() if now is None else now) - token.issued_at
+    return age < token.lifetime * TOKEN_REUSE_MARGIN
@@ -0,0 +1,225 @@
+"""A module for Dwelo binary sensors."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONF_CONNECTIVITY_HOLD,
+    DEFAULT_CONNECTIVITY_HOLD,
+    DOMAIN,
+    SIGNAL_DEVICES_ADDED,
+)
+from .coordinator import DweloGatewayCoordinator
+from .device_converter import parse_bool
+from .entity import DweloEntity, DweloSensorEntityBase, async_add_sensor_entities
+from .models import DweloData, DweloDeviceMetadata
+
+
+@dataclass(frozen=True, kw_only=True)
+class DweloBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Dwelo binary sensor; key is the Dwelo sensorType."""
+
+    value_fn: Callable[[any], bool] = parse_bool
+
+
+# Sensor types shown as binary sensors.
+BINARY_SENSOR_DESCRIPTIONS: dict[str, DweloBinarySensorEntityDescription] = {
+    description.key: description
+    for description in (
+        DweloBinarySensorEntityDescription(
+            key="door",
+            name="Door",
+            device_class=BinarySensorDeviceClass.DOOR,
+        ),
+        DweloBinarySensorEntityDescription(
+            key="window",
+            name="Window",
+            device_class=BinarySensorDeviceClass.WINDOW,
+        ),
+        DweloBinarySensorEntityDescription(
+            key="contact",
+            name="Contact",
+            device_class=BinarySensorDeviceClass.OPENING,
+        ),
+        DweloBinarySensorEntityDescription(
+            key="leak",
+            name="Leak",
+            device_class=BinarySensorDeviceClass.MOISTURE,
+        ),
+        DweloBinarySensorEntityDescription(
+            key="motion",
+            name="Motion",
+            device_class=BinarySensorDeviceClass.MOTION,
+        ),
+        DweloBinarySensorEntityDescription(
+            key="tamper",
+            name="Tamper",
+            device_class=BinarySensorDeviceClass.TAMPER,
+        ),
+    )
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the Dwelo binary sensor platform."""
+    async_add_sensor_entities(
+        hass,
+        entry,
+        async_add_entities,
+        BINARY_SENSOR_DESCRIPTIONS,
+        DweloBinarySensorEntity,
+    )
+
+    data: DweloData = hass.data[DOMAIN][entry.entry_id]
+    hold = entry.options.get(CONF_CONNECTIVITY_HOLD, DEFAULT_CONNECTIVITY_HOLD)
+    added: set[str] = set()
+
+    @callback
+    def _async_add_connectivity(device_metadata: list[DweloDeviceMetadata]) -> None:
+        """Add a connectivity entity for every given device that has none.
+
+        A device that changed type is announced again, but its connectivity
+        entity applies to any type and is kept.
+        """
+        added.intersection_update(data.device_metadata)
+        entities = []
+        for metadata in device_metadata:
+            if metadata.uid in added or metadata.gateway_id not in data.coordinators:
+                continue
+            added.add(metadata.uid)
+            entities.append(
+                DweloConnectivityEntity(
+                    data.coordinators[metadata.gateway_id], metadata, hold
+                )
+            )
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_connectivity(list(data.device_metadata.values()))
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_connectivity
+        )
+    )
+
+
+class DweloBinarySensorEntity(DweloSensorEntityBase, BinarySensorEntity):
+    """A binary sensor of a Dwelo device."""
+
+    entity_description: DweloBinarySensorEntityDescription
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the converted sensor value."""
+        return self._value
+
+
+class DweloConnectivityEntity(DweloEntity, BinarySensorEntity):
+    """Whether a Dwelo device is reachable.
+
+    A device counts as connected when the account lists it as online and its
+    gateway answers polls with data for it. A change is only written once it
+    has lasted for the hold time, so a device that drops out for a poll or
+    two does not flap in the history.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: DweloGatewayCoordinator,
+        metadata: DweloDeviceMetadata,
+        hold: float,
+    ) -> None:
+        """Initialize the connectivity sensor."""
+        super().__init__(coordinator, metadata)
+        self._hold = hold
+        self._attr_unique_id = f"connectivity_{metadata.uid}"
+        self._attr_name = f"{metadata.given_name} Connectivity"
+        self._attr_is_on = self._observed_online()
+        self._cancel_hold: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Cancel a pending change when the entity is removed."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_hold)
+
+    @property
+    def available(self) -> bool:
+        """Return if the API is reachable.
+
+        An unreachable gateway is reported as disconnected, not unavailable.
+        """
+        return self.coordinator.client.available
+
+    def _update_metadata(self, metadata: DweloDeviceMetadata) -> None:
+        """Apply changed device metadata, including its online flag."""
+        self._attr_name = f"{metadata.given_name} Connectivity"
+        self._async_observe()
+
+    def _observed_online(self) -> bool:
+        """Return if the device looks connected right now."""
+        snapshot = self.coordinator.data
+        return (
+            self._metadata.is_online
+            and self.coordinator.last_update_success
+            and self.coordinator.gateway_available
+            and snapshot is not None
+            and self._metadata.uid in snapshot.sensor_index
+        )
+
+    @callback
+    def _async_observe(self) -> bool:
+        """Track the observed connectivity, returning True if the state changed.
+
+        A change starts the hold timer and is only applied if it still holds
+        when the timer fires; returning to the current state cancels it.
+        """
+        if self._observed_online() == self._attr_is_on:
+            self._async_cancel_hold()
+            return False
+        if not self._hold:
+            self._attr_is_on = not self._attr_is_on
+            return True
+        if self._cancel_hold is None:
+            self._cancel_hold = async_call_later(
+                self.hass, self._hold, self._async_hold_elapsed
+            )
+        return False
+
+    @callback
+    def _async_hold_elapsed(self, _now: datetime) -> None:
+        """Apply a connectivity change that lasted for the hold time."""
+        self._cancel_hold = None
+        if self._observed_online() != self._attr_is_on:
+            self._attr_is_on = not self._attr_is_on
+            self._async_write_state()
+
+    @callback
+    def _async_cancel_hold(self) -> None:
+        """Drop a pending connectivity change."""
+        if self._cancel_hold is not None:
+            self._cancel_hold()
+            self._cancel_hold = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the connectivity from the latest gateway poll."""
+        if self._async_observe() or self._availability_changed():
+            self._async_write_state()
@@ -0,0 +1,141 @@
+"""Persistent cache of Dwelo devices and their last known state."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from functools import partial
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .coordinator import DweloGatewayCoordinator
+from .device_converter import convert_gateway
+from .models import DweloDeviceMetadata, DweloGatewaySnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Gateway states change often, so batch them into one write every so often.
+SAVE_DELAY = 60
+
+
+class DweloCache:
+    """Keeps the device list and the last sensors of every gateway on disk.
+
+    On restart entities are created from the cache right away, while login,
+    discovery and the first poll catch up in the background. Gateway state is
+    stored as the raw sensor values it was converted from, so the cached
+    snapshots go through the same converters as a live poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Create the cache of a config entry."""
+        self._store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._device_metadata: dict[str, DweloDeviceMetadata] = {}
+        self._gateway_sensors: dict[str, list[dict]] = {}
+        self._snapshots: dict[str, DweloGatewaySnapshot] = {}
+
+    @property
+    def device_metadata(self) -> dict[str, DweloDeviceMetadata]:
+        """Get the cached device metadata."""
+        return self._device_metadata
+
+    async def async_load(self) -> bool:
+        """Load the cache, returning True if it knows any devices."""
+        data = await self._store.async_load()
+        if not data:
+            return False
+
+        try:
+            self._device_metadata = {
+                device["uid"]: DweloDeviceMetadata(**device)
+                for device in data["devices"]
+            }
+            self._gateway_sensors = dict(data["gateways"])
+        except (KeyError, TypeError) as err:
+            _LOGGER.warning(f"Ignoring unreadable Dwelo cache: {err}")  # noqa: G004
+            self._device_metadata = {}
+            self._gateway_sensors = {}
+            return False
+
+        return bool(self._device_metadata)
+
+    def snapshot(
+        self, gateway_id: str, device_metadata: dict[str, DweloDeviceMetadata]
+    ) -> DweloGatewaySnapshot | None:
+        """Get the last known state of a gateway, if it was cached."""
+        sensors = self._gateway_sensors.get(gateway_id)
+        if sensors is None:
+            return None
+        return convert_gateway({"results": sensors}, device_metadata)
+
+    @callback
+    def async_set_devices(
+        self, device_metadata: dict[str, DweloDeviceMetadata]
+    ) -> None:
+        """Replace the cached device metadata."""
+        self._device_metadata = dict(device_metadata)
+        self._async_schedule_save()
+
+    @callback
+    def async_track(self, coordinator: DweloGatewayCoordinator) -> CALLBACK_TYPE:
+        """Keep the cached state of a gateway in sync with its coordinator."""
+        self._async_coordinator_updated(coordinator)
+        return coordinator.async_add_listener(
+            partial(self._async_coordinator_updated, coordinator)
+        )
+
+    @callback
+    def async_forget_gateway(self, gateway_id: str) -> None:
+        """Drop the cached state of a gateway that no longer has devices."""
+        self._snapshots.pop(gateway_id, None)
+        if self._gateway_sensors.pop(gateway_id, None) is not None:
+            self._async_schedule_save()
+
+    async def async_save(self) -> None:
+        """Write the cache to disk right away."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the cache from disk."""
+        await self._store.async_remove()
+
+    @callback
+    def _async_coordinator_updated(
+        self, coordinator: DweloGatewayCoordinator
+    ) -> None:
+        """Remember the latest snapshot of a gateway."""
+        if coordinator.data is None:
+            return
+        self._snapshots[coordinator.gateway_id] = coordinator.data
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Write the cache to disk after a short delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Get the cache as JSON serializable data.
+
+        Snapshots are flattened here rather than on every poll, so a burst of
+        updates only costs one conversion.
+        """
+        for gateway_id, snapshot in self._snapshots.items():
+            self._gateway_sensors[gateway_id] = [
+                {"deviceId": device_id, "sensorType": sensor_type, "value": value}
+                for device_id, sensors in snapshot.sensor_index.items()
+                for sensor_type, sensor in sensors.items()
+                if (value := sensor.get("value")) is not None
+            ]
+        self._snapshots.clear()
+
+        return {
+            "devices": [asdict(device) for device in self._device_metadata.values()],
+            "gateways": self._gateway_sensors,
+        }
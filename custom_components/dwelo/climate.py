@@ -1,40 +1,52 @@
 """A module for dwelo climate devices."""
 
-from datetime import timedelta
 import logging
 from typing import Any
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
+    ATTR_HVAC_MODE,
     ClimateEntityFeature,
     HVACAction,
     HVACMode,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .commands import DweloCommandTracker
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
+from .coordinator import DweloGatewayCoordinator
 from .dwelo_devices.dwelo_thermostat import DweloThermostatDevice
-from .models import DweloData, DweloThermostatMode
+from .entity import DweloEntity
+from .models import (
+    DweloData,
+    DweloDeviceMetadata,
+    DweloDeviceType,
+    DweloThermostatMode,
+    DweloThermostatState,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 DWELO_MODE_TO_HA_MODE = {
-    "heat": HVACMode.HEAT,
-    "cool": HVACMode.COOL,
+    DweloThermostatMode.HEAT: HVACMode.HEAT,
+    DweloThermostatMode.COOL: HVACMode.COOL,
 }
 HA_MODE_TO_DWELO_MODE = {v: k for k, v in DWELO_MODE_TO_HA_MODE.items()}
 
 DWELO_STATE_TO_HA_ACTION = {
-    "heat": HVACAction.HEATING,
-    "cool": HVACAction.COOLING,
-    "idle": HVACAction.IDLE,
+    DweloThermostatState.HEAT: HVACAction.HEATING,
+    DweloThermostatState.COOL: HVACAction.COOLING,
+    DweloThermostatState.IDLE: HVACAction.IDLE,
 }
 HA_ACTION_TO_DWELO_STATE = {v: k for k, v in DWELO_STATE_TO_HA_ACTION.items()}
 
-SCAN_INTERVAL = timedelta(seconds=30)
+# Setpoints reported within this many degrees count as confirmed.
+TEMPERATURE_TOLERANCE = 0.5
 
 
 async def async_setup_entry(
@@ -43,26 +55,57 @@ async def async_setup_entry(
     """Set up the Dwelo climate platform."""
 
     data: DweloData = hass.data[DOMAIN][entry.entry_id]
-    entities = []
 
-    for metadata in data.device_metadata.values():
-        if metadata.device_type == "thermostat":
-            device = await DweloThermostatDevice.from_metadata(data.client, metadata)
-            entities.append(DweloThermostatEntity(device))
+    @callback
+    def _async_add_thermostats(device_metadata: list[DweloDeviceMetadata]) -> None:
+        """Add an entity for every thermostat in the given devices."""
+        entities = []
+        failed = []
+
+        for metadata in device_metadata:
+            if metadata.device_type == "thermostat":
+                coordinator = data.coordinators[metadata.gateway_id]
+                device = DweloThermostatDevice.from_snapshot(
+                    data.client, metadata, coordinator.data
+                )
+                if coordinator.data and metadata.uid in coordinator.data.errors:
+                    failed.append(metadata.uid)
+                entities.append(
+                    DweloThermostatEntity(coordinator, device, data.command_tracker)
+                )
+
+        if failed:
+            _LOGGER.warning(
+                f"{len(failed)} thermostats have no usable data and start unavailable: {failed}"  # noqa: G004
+            )
+
+        if entities:
+            async_add_entities(entities)
 
-    async_add_entities(entities)
+    _async_add_thermostats(list(data.device_metadata.values()))
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_thermostats
+        )
+    )
 
 
-class DweloThermostatEntity(ClimateEntity):
+class DweloThermostatEntity(DweloEntity, ClimateEntity):
     """Representation of a Dwelo thermostat entity within Home Assistant."""
 
     def __init__(
         self,
+        coordinator: DweloGatewayCoordinator,
         device: DweloThermostatDevice,
+        command_tracker: DweloCommandTracker,
     ) -> None:
         """Initialize the thermostat."""
-        super().__init__()
+        super().__init__(coordinator, device.metadata)
         self._device = device
+        self._command_tracker = command_tracker
+        # The requested mode and setpoint, until the gateway reports them.
+        self._pending_mode: DweloThermostatMode | None = None
+        self._pending_temperature: float | None = None
 
         self._attr_unique_id = f"thermostat_{self._device.metadata.uid}"
         self._attr_name = self._device.metadata.given_name
@@ -70,64 +113,172 @@ class DweloThermostatEntity(ClimateEntity):
         self._attr_hvac_modes = [HVACMode.HEAT, HVACMode.COOL]
         self._attr_supported_features = self._get_supported_features()
 
-    async def async_update(self) -> None:
-        """Update the thermostat data from the Dwelo API."""
-        await self._device.async_update()
+    def _handles_device(self, metadata: DweloDeviceMetadata) -> bool:
+        """Return True while the device is a thermostat."""
+        return metadata.device_type == DweloDeviceType.THERMOSTAT.value
+
+    def _update_metadata(self, metadata: DweloDeviceMetadata) -> None:
+        """Apply changed device metadata to the thermostat."""
+        super()._update_metadata(metadata)
+        self._device.metadata = metadata
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the thermostat data from the latest gateway poll.
+
+        Nothing is written to the state machine unless the thermostat's own
+        sensor values or its availability changed.
+        """
+        changed = self._device.update_from_snapshot(self.coordinator.data)
+        resolved = self._has_pending_command() and self._pending_command_reported()
+        if resolved:
+            self._clear_pending_command()
+            self._command_tracker.async_resolve(self._device.metadata.uid)
+        if not (changed or resolved or self._availability_changed()):
+            return
+
         _LOGGER.debug(f"Updated thermostat data {self._device.data}")  # noqa: G004
+        self._async_write_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop tracking any pending command."""
+        await super().async_will_remove_from_hass()
+        self._command_tracker.async_resolve(self._device.metadata.uid)
+
+    @property
+    def available(self) -> bool:
+        """Return if the thermostat has data and its gateway is reachable."""
+        return super().available and self._device.data is not None
 
     @property
     def current_temperature(self) -> float:
         """Return the current temperature."""
+        if self._device.data is None:
+            return None
         return self._device.data.current_temperature
 
     @property
     def target_temperature(self) -> float:
         """Return the target temperature based on HVAC mode."""
-        if DWELO_MODE_TO_HA_MODE[self._device.data.mode] == HVACMode.HEAT:
-            return self._device.data.target_temperature_heat
-        if DWELO_MODE_TO_HA_MODE[self._device.data.mode] == HVACMode.COOL:
-            return self._device.data.target_temperature_cool
-
-        return None
+        if self._pending_temperature is not None:
+            return self._pending_temperature
+        if self._device.data is None:
+            return None
+        return self._reported_target_temperature(self._current_mode())
 
     @property
     def hvac_mode(self) -> HVACMode:
         """Return the current HVAC mode."""
-        return DWELO_MODE_TO_HA_MODE[self._device.data.mode]
+        if self._device.data is None:
+            return None
+        return DWELO_MODE_TO_HA_MODE.get(self._current_mode())
 
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the current HVAC action."""
+        if self._device.data is None:
+            return None
         return DWELO_STATE_TO_HA_ACTION[self._device.data.state]
 
     def _get_supported_features(self) -> ClimateEntityFeature:
         """Compute the bitmap of supported features from the current state."""
         return ClimateEntityFeature.TARGET_TEMPERATURE
 
+    def _current_mode(self) -> DweloThermostatMode:
+        """Get the requested mode if a command is pending, else the reported one."""
+        return self._pending_mode or self._device.data.mode
+
+    def _reported_target_temperature(self, mode: DweloThermostatMode) -> float:
+        """Get the setpoint the gateway reports for a mode."""
+        if mode is DweloThermostatMode.HEAT:
+            return self._device.data.target_temperature_heat
+        if mode is DweloThermostatMode.COOL:
+            return self._device.data.target_temperature_cool
+
+        return None
+
+    def _has_pending_command(self) -> bool:
+        """Return True while a command has not been reported by the gateway."""
+        return self._pending_mode is not None or self._pending_temperature is not None
+
+    def _pending_command_reported(self) -> bool:
+        """Check if the gateway reports the mode and setpoint we asked for."""
+        if self._device.data is None:
+            return False
+        if self._pending_mode not in (None, self._device.data.mode):
+            return False
+        if self._pending_temperature is None:
+            return True
+        reported = self._reported_target_temperature(self._current_mode())
+        return (
+            reported is not None
+            and abs(reported - self._pending_temperature) <= TEMPERATURE_TOLERANCE
+        )
+
+    def _clear_pending_command(self) -> None:
+        """Forget the requested mode and setpoint."""
+        self._pending_mode = None
+        self._pending_temperature = None
+
+    @callback
+    def _handle_command_timeout(self) -> None:
+        """Fall back to the reported state when a command never shows up."""
+        self._clear_pending_command()
+        self._async_write_state()
+
     async def _set_ac(
         self,
         temperature: float = None,  # noqa: RUF013
         mode: DweloThermostatMode = None,  # noqa: RUF013
     ) -> None:
+        """Show the requested mode/setpoint right away and queue the command.
+
+        Rapid changes, e.g. while dragging the setpoint, are coalesced by the
+        device so only the latest values are sent.
+        """
+        change_mode = mode is not None and mode != self._current_mode()
         if mode is None:
-            mode = self._device.data.mode
-        if temperature is None:
-            await self._device.set_thermostat_mode(self._device.metadata, mode)
-        else:
-            await self._device.set_thermostat_temperature(
-                self._device.metadata, temperature, mode
+            mode = self._current_mode()
+
+        self._pending_mode = mode
+        if temperature is not None:
+            self._pending_temperature = temperature
+        self._async_write_state()
+
+        success = await self._device.async_queue_command(
+            mode=mode if change_mode else None,
+            setpoint=(mode, temperature) if temperature is not None else None,
+        )
+        if not success:
+            self._handle_command_timeout()
+            raise HomeAssistantError(
+                f"Failed to update thermostat {self._device.metadata.given_name}"
             )
 
+        if not self._has_pending_command() or self._pending_command_reported():
+            # Already reported, e.g. the setpoint did not change. Identical
+            # gateway data does not reach the entity, so no later poll would
+            # confirm the command.
+            self._clear_pending_command()
+            self._async_write_state()
+            return
+
+        self._command_tracker.async_track(
+            self.coordinator,
+            self._device.metadata.uid,
+            f"{mode.value} {temperature}" if temperature is not None else mode.value,
+            self._handle_command_timeout,
+        )
+
     async def async_set_temperature(self, **kwargs: Any) -> None:
-        """Set the target temperature."""
+        """Set the target temperature, and the mode if one is given."""
         _LOGGER.info(f"Setting temperature with args: {kwargs}")  # noqa: G004
-        await self._set_ac(temperature=kwargs[ATTR_TEMPERATURE])
-        self.async_write_ha_state()
-        await self.async_update()
+        mode = None
+        if (hvac_mode := kwargs.get(ATTR_HVAC_MODE)) is not None:
+            mode = HA_MODE_TO_DWELO_MODE[hvac_mode]
+        await self._set_ac(temperature=kwargs.get(ATTR_TEMPERATURE), mode=mode)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set the HVAC mode."""
         _LOGGER.info(f"Setting hvac mode to {hvac_mode}")  # noqa: G004
         await self._set_ac(mode=HA_MODE_TO_DWELO_MODE[hvac_mode])
-        self.async_write_ha_state()
-        await self.async_update()
@@ -0,0 +1,104 @@
+"""Coalescing of identical Dwelo API reads."""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+import itertools
+import time
+
+# How long a GET response is reused, and how many responses are kept.
+DEFAULT_RESPONSE_TTL = 3.0
+DEFAULT_MAX_CACHED_RESPONSES = 64
+
+
+class SingleFlight:
+    """Shares one in-flight call between everyone asking for the same key.
+
+    Keys are tuples that start with the endpoint, so everything in flight for
+    an endpoint can be forgotten at once. The shared call keeps running when
+    one of its callers is cancelled, as long as anyone might still use it.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty single-flight group."""
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def is_in_flight(self, key: tuple) -> bool:
+        """Return True if a call for the key is running."""
+        return key in self._calls
+
+    async def run(self, key: tuple, call: Callable[[], Awaitable[any]]) -> any:
+        """Wait for the running call of the key, or start one."""
+        if (future := self._calls.get(key)) is None:
+            future = self._calls[key] = asyncio.ensure_future(call())
+            future.add_done_callback(partial(self._async_done, key))
+        return await asyncio.shield(future)
+
+    def forget(self, endpoint: str) -> None:
+        """Make later callers of an endpoint start a new call.
+
+        Callers already waiting still get the result of the running call.
+        """
+        for key in [key for key in self._calls if key[0] == endpoint]:
+            del self._calls[key]
+
+    def _async_done(self, key: tuple, future: asyncio.Future) -> None:
+        """Drop a finished call, keeping a newer one for the same key."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Nobody may be waiting anymore, so retrieve the error here.
+            future.exception()
+
+
+class ResponseCache:
+    """Keeps recent GET responses for a short time, evicting the oldest used.
+
+    Entries are keyed by endpoint. Invalidating an endpoint also rejects the
+    responses of requests that were already running at the time, so a read
+    that raced a command never brings the old state back.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_RESPONSE_TTL,
+        max_entries: int = DEFAULT_MAX_CACHED_RESPONSES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an empty response cache."""
+        self._ttl = ttl
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, any]] = OrderedDict()
+        self._stamps = itertools.count()
+        self._invalidated: dict[str, int] = {}
+
+    def get(self, endpoint: str) -> any:
+        """Get the cached response of an endpoint, or None."""
+        if (entry := self._entries.get(endpoint)) is None:
+            return None
+        expires, response = entry
+        if self._clock() >= expires:
+            del self._entries[endpoint]
+            return None
+        self._entries.move_to_end(endpoint)
+        return response
+
+    def begin(self) -> int:
+        """Get the stamp to pass to put for a request that starts now."""
+        return next(self._stamps)
+
+    def put(self, endpoint: str, response: any, stamp: int) -> None:
+        """Cache a response, unless its endpoint was invalidated since stamp."""
+        if self._invalidated.get(endpoint, -1) >= stamp:
+            return
+        self._entries[endpoint] = (self._clock() + self._ttl, response)
+        self._entries.move_to_end(endpoint)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: str) -> None:
+        """Drop the response of an endpoint and of requests still running."""
+        self._entries.pop(endpoint, None)
+        self._invalidated[endpoint] = next(self._stamps)
@@ -0,0 +1,132 @@
+"""Tracking of Dwelo commands until the gateway reports them."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import COMMAND_CONVERGENCE_TIMEOUT, EVENT_COMMAND_NOT_CONVERGED
+from .coordinator import DweloGatewayCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingCommand:
+    """A command sent to a device that the gateway has not confirmed yet."""
+
+    uid: str
+    command: str
+    coordinator: DweloGatewayCoordinator
+    on_timeout: Callable[[], None]
+    cancel_timeout: CALLBACK_TYPE
+
+
+class DweloCommandTracker:
+    """Keeps polling a gateway until the commands sent to it are confirmed.
+
+    The entity that sent a command keeps showing the requested state, resolves
+    the command once a gateway poll reports it, and falls back to the reported
+    state if the deadline passes first. The gateway is polled on a short backoff
+    while any of its devices has a pending command.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Create a command tracker."""
+        self._hass = hass
+        self._pending: dict[str, PendingCommand] = {}
+        self._first_polls: dict[str, CALLBACK_TYPE] = {}
+
+    def is_pending(self, uid: str) -> bool:
+        """Return True if the device has an unconfirmed command."""
+        return uid in self._pending
+
+    @callback
+    def async_track(
+        self,
+        coordinator: DweloGatewayCoordinator,
+        uid: str,
+        command: str,
+        on_timeout: Callable[[], None],
+        timeout: timedelta = COMMAND_CONVERGENCE_TIMEOUT,
+    ) -> None:
+        """Start tracking a command that was just sent to a device."""
+        if previous := self._pending.pop(uid, None):
+            previous.cancel_timeout()
+
+        self._pending[uid] = PendingCommand(
+            uid=uid,
+            command=command,
+            coordinator=coordinator,
+            on_timeout=on_timeout,
+            cancel_timeout=async_call_later(
+                self._hass, timeout, partial(self._async_expire, uid)
+            ),
+        )
+
+        # The gateway rarely reflects a command right away, so give it a moment
+        # before the first poll and back off from there.
+        coordinator.boost_polling()
+        gateway_id = coordinator.gateway_id
+        if gateway_id not in self._first_polls:
+            self._first_polls[gateway_id] = async_call_later(
+                self._hass,
+                coordinator.first_fast_interval,
+                partial(self._async_first_poll, coordinator),
+            )
+
+    @callback
+    def async_resolve(self, uid: str) -> None:
+        """Mark the command of a device as confirmed by the gateway."""
+        if pending := self._pending.pop(uid, None):
+            pending.cancel_timeout()
+            self._async_settle(pending.coordinator)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop tracking all commands."""
+        for pending in self._pending.values():
+            pending.cancel_timeout()
+        self._pending.clear()
+        for cancel in self._first_polls.values():
+            cancel()
+        self._first_polls.clear()
+
+    @callback
+    def _async_first_poll(
+        self, coordinator: DweloGatewayCoordinator, _now: datetime
+    ) -> None:
+        """Poll a gateway for the first time after a command."""
+        self._first_polls.pop(coordinator.gateway_id, None)
+        self._hass.async_create_task(coordinator.async_refresh())
+
+    @callback
+    def _async_expire(self, uid: str, _now: datetime) -> None:
+        """Give up on a command the gateway never confirmed."""
+        if not (pending := self._pending.pop(uid, None)):
+            return
+
+        _LOGGER.warning(
+            f"Dwelo device {uid} did not report the result of {pending.command}"  # noqa: G004
+        )
+        self._hass.bus.async_fire(
+            EVENT_COMMAND_NOT_CONVERGED,
+            {"device_id": uid, "command": pending.command},
+        )
+        pending.on_timeout()
+        self._async_settle(pending.coordinator)
+
+    @callback
+    def _async_settle(self, coordinator: DweloGatewayCoordinator) -> None:
+        """Stop fast polling a gateway that has no pending commands left."""
+        if any(
+            pending.coordinator is coordinator for pending in self._pending.values()
+        ):
+            return
+        coordinator.settle_polling()
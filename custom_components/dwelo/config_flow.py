@@ -7,12 +7,33 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN, HOST
+from .auth import token_to_entry_data
+from .const import (
+    CONF_BATTERY_DEADBAND,
+    CONF_CONNECTIVITY_HOLD,
+    CONF_LOCK_SCAN_INTERVAL,
+    CONF_SETUP_CONCURRENCY,
+    CONF_STREAM_RESPONSES,
+    CONF_THERMOSTAT_SCAN_INTERVAL,
+    DEFAULT_BATTERY_DEADBAND,
+    DEFAULT_CONNECTIVITY_HOLD,
+    DEFAULT_LOCK_SCAN_INTERVAL,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_STREAM_RESPONSES,
+    DEFAULT_THERMOSTAT_SCAN_INTERVAL,
+    DOMAIN,
+    HOST,
+)
 from .dwelo_client import DweloClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -63,8 +84,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     # If the authentication is wrong:
     # InvalidAuth
 
-    # Return info that you want to store in the config entry.
-    return True
+    # Keep the token of this login, so setting up the entry needs no second one.
+    return token_to_entry_data(client.token)
 
 
 class ConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -72,6 +93,12 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return DweloOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -79,7 +106,7 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
         if user_input is not None:
             try:
-                await validate_input(self.hass, user_input)
+                token_data = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -88,13 +115,76 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                return self.async_create_entry(title=DOMAIN, data=user_input)
+                return self.async_create_entry(
+                    title=DOMAIN, data={**user_input, **token_data}
+                )
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
 
+class DweloOptionsFlow(OptionsFlow):
+    """Handle Dwelo options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_LOCK_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_LOCK_SCAN_INTERVAL, DEFAULT_LOCK_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Required(
+                        CONF_THERMOSTAT_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_THERMOSTAT_SCAN_INTERVAL,
+                            DEFAULT_THERMOSTAT_SCAN_INTERVAL,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Required(
+                        CONF_SETUP_CONCURRENCY,
+                        default=options.get(
+                            CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Required(
+                        CONF_BATTERY_DEADBAND,
+                        default=options.get(
+                            CONF_BATTERY_DEADBAND, DEFAULT_BATTERY_DEADBAND
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
+                    vol.Required(
+                        CONF_CONNECTIVITY_HOLD,
+                        default=options.get(
+                            CONF_CONNECTIVITY_HOLD, DEFAULT_CONNECTIVITY_HOLD
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_STREAM_RESPONSES,
+                        default=options.get(
+                            CONF_STREAM_RESPONSES, DEFAULT_STREAM_RESPONSES
+                        ),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
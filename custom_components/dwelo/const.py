@@ -1,4 +1,55 @@
 """Constants for the Dwelo Integration integration."""
 
+from datetime import timedelta
+
 DOMAIN = "dwelo"
-HOST = "https://api.dwelo.com/v3"
\ No newline at end of file
+HOST = "https://api.dwelo.com/v3"
+
+DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
+
+# The bearer token is kept in the config entry data, so a restart does not
+# have to log in again.
+CONF_TOKEN_ISSUED = "token_issued"
+CONF_TOKEN_LIFETIME = "token_lifetime"
+
+# Base poll intervals in seconds, adjusted at runtime by AdaptivePollInterval.
+CONF_LOCK_SCAN_INTERVAL = "lock_scan_interval"
+CONF_THERMOSTAT_SCAN_INTERVAL = "thermostat_scan_interval"
+DEFAULT_LOCK_SCAN_INTERVAL = 30
+DEFAULT_THERMOSTAT_SCAN_INTERVAL = 30
+
+CONF_SETUP_CONCURRENCY = "setup_concurrency"
+DEFAULT_SETUP_CONCURRENCY = 4
+
+# Parse large device and gateway listings while they download.
+CONF_STREAM_RESPONSES = "stream_responses"
+DEFAULT_STREAM_RESPONSES = False
+
+# Key of the DweloSharedData in hass.data[DOMAIN], next to the entry IDs.
+DATA_SHARED = "shared"
+
+# Battery changes smaller than this many percent are not written.
+CONF_BATTERY_DEADBAND = "battery_deadband"
+DEFAULT_BATTERY_DEADBAND = 5
+
+# Seconds a connectivity change has to last before it is written.
+CONF_CONNECTIVITY_HOLD = "connectivity_hold"
+DEFAULT_CONNECTIVITY_HOLD = 120
+
+# Devices are discovered again this often to pick up added and removed ones.
+DISCOVERY_INTERVAL = timedelta(minutes=15)
+
+# Dispatcher signals of incremental discovery, formatted with the config entry
+# ID (added) or the device uid (updated, removed).
+SIGNAL_DEVICES_ADDED = f"{DOMAIN}_devices_added_{{}}"
+SIGNAL_DEVICE_UPDATED = f"{DOMAIN}_device_updated_{{}}"
+SIGNAL_DEVICE_REMOVED = f"{DOMAIN}_device_removed_{{}}"
+
+# Fired when the gateway never reports the state a command asked for.
+EVENT_COMMAND_NOT_CONVERGED = f"{DOMAIN}_command_not_converged"
+COMMAND_CONVERGENCE_TIMEOUT = timedelta(seconds=60)
+
+# Services that send one command to many devices.
+SERVICE_BULK_LOCK = "bulk_lock"
+SERVICE_BULK_UNLOCK = "bulk_unlock"
+SERVICE_BULK_SET_TEMPERATURE = "bulk_set_temperature"
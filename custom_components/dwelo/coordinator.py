@@ -0,0 +1,212 @@
+"""Data update coordinators for the Dwelo integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from .device_converter import convert_gateway
+from .dwelo_client import NOT_SENT, NOT_MODIFIED, DweloClient
+from .models import DweloDeviceMetadata, DweloGatewaySnapshot
+from .polling import AdaptivePollInterval, GatewayHealth
+from .shared import async_get_shared_data
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields of a gateway sensor entry that convert_gateway uses.
+SENSOR_FIELDS = ("deviceId", "sensorType", "value")
+
+
+class DweloGatewayCoordinator(DataUpdateCoordinator[DweloGatewaySnapshot]):
+    """Polls a single Dwelo gateway on behalf of every device attached to it.
+
+    Dwelo reports sensor values per gateway, so one request per gateway per
+    cycle is enough to update all of its locks and thermostats. Each poll is
+    converted once into a DweloGatewaySnapshot that all entities read from.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: DweloClient,
+        gateway_id: str,
+        device_metadata: dict[str, DweloDeviceMetadata],
+        base_interval: timedelta = DEFAULT_SCAN_INTERVAL,
+    ) -> None:
+        """Create a coordinator for a gateway."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} gateway {gateway_id}",
+            update_interval=base_interval,
+            # Unchanged gateway data doesn't need to reach the entities.
+            always_update=False,
+        )
+        self._client = client
+        self._digest: str | None = None
+        self._poll_interval = AdaptivePollInterval(base_interval)
+        self._stagger = async_get_shared_data(hass).poll_stagger
+        self._stagger.register(self)
+        self._health = GatewayHealth()
+        self.gateway_id = gateway_id
+        self.device_metadata = device_metadata
+        self._health.set_offline(_all_offline(device_metadata))
+        if not self._health.healthy:
+            self.update_interval = self._health.probe_interval
+
+    @property
+    def client(self) -> DweloClient:
+        """Get the client used to poll the gateway."""
+        return self._client
+
+    @property
+    def gateway_available(self) -> bool:
+        """Return False while the gateway is failing or all its devices are offline.
+
+        The entities of such a gateway are unavailable, and the gateway is only
+        probed now and then.
+        """
+        return self._health.healthy
+
+    @property
+    def first_fast_interval(self) -> timedelta:
+        """Get the delay before the first poll after a command."""
+        return self._poll_interval.first_fast_interval
+
+    def _set_next_interval(self, interval: timedelta) -> None:
+        """Set the delay until the next poll.
+
+        Outside of the fast polls after a command, the poll is moved to this
+        gateway's slot of the shared schedule, so gateways of all accounts
+        take turns instead of polling on the same tick.
+        """
+        if not self._poll_interval.boosted:
+            interval = self._stagger.delay(self, interval)
+        self.update_interval = interval
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and give up the gateway's slot of the schedule."""
+        await super().async_shutdown()
+        self._stagger.unregister(self)
+
+    def boost_polling(self) -> None:
+        """Poll on a short backoff while a command settles."""
+        self._poll_interval.boost()
+        self._set_next_interval(self._next_interval())
+
+    def settle_polling(self) -> None:
+        """Return to the normal poll interval once commands have settled."""
+        self._poll_interval.settle()
+        self._set_next_interval(self._next_interval())
+
+    @callback
+    def async_set_device_metadata(
+        self, device_metadata: dict[str, DweloDeviceMetadata]
+    ) -> None:
+        """Replace the devices of the gateway after a discovery.
+
+        The last poll is converted again so metadata that goes into the device
+        state shows up right away. Added devices need a fresh poll, as their
+        sensors may have been skipped or the body may not have changed.
+        """
+        added = device_metadata.keys() - self.device_metadata.keys()
+        self.device_metadata = device_metadata
+        was_offline = self._health.offline
+        self._health.set_offline(_all_offline(device_metadata))
+        if self._health.offline != was_offline:
+            _LOGGER.info(
+                f"Dwelo gateway {self.gateway_id} is {'offline' if self._health.offline else 'back online'}"  # noqa: G004
+            )
+            self._set_next_interval(self._next_interval())
+        if self.data is not None:
+            sensors = [
+                sensor
+                for device_sensors in self.data.sensor_index.values()
+                for sensor in device_sensors.values()
+            ]
+            self.async_set_updated_data(
+                convert_gateway({"results": sensors}, device_metadata)
+            )
+        if added or (was_offline and not self._health.offline):
+            self._digest = None
+            self.hass.async_create_task(self.async_request_refresh())
+
+    def _is_known_sensor(self, sensor: dict) -> bool:
+        """Return True if a sensor belongs to a device set up on this gateway."""
+        return sensor.get("deviceId") in self.device_metadata
+
+    async def _async_update_data(self) -> DweloGatewaySnapshot:
+        """Fetch and convert the sensor data for the gateway.
+
+        When the gateway returns the same body as last time the previous
+        snapshot is returned as is, which skips decoding, conversion and entity
+        updates.
+        """
+        result = await self._client.get_if_changed(
+            f"{self._client.GATEWAY_ENDPOINT}{self.gateway_id}",
+            self._digest if self.data is not None else None,
+            deadline=self.hass.loop.time() + self._client.timeouts.poll_cycle,
+            stream=self._client.stream_responses,
+            keep=self._is_known_sensor,
+            fields=SENSOR_FIELDS,
+        )
+        if result is NOT_SENT or not result or not result[0]:
+            # A poll held back by the circuit breaker or the request queue says
+            # nothing about the gateway, so only sent polls count against it.
+            if result is not NOT_SENT:
+                self._record_health(False)
+            self._set_next_interval(
+                self._poll_interval.base_interval
+                if self._health.healthy
+                else self._health.probe_interval
+            )
+            raise UpdateFailed(f"No gateway data for gateway ID {self.gateway_id}")
+
+        self._record_health(True)
+        gateway_data, self._digest = result
+        if gateway_data is NOT_MODIFIED:
+            self._poll_interval.record_poll(False)
+            self._set_next_interval(self._next_interval())
+            return self.data
+
+        snapshot = convert_gateway(gateway_data, self.device_metadata, self.data)
+        if snapshot.errors and (
+            self.data is None or snapshot.errors != self.data.errors
+        ):
+            _LOGGER.warning(
+                f"Skipped {len(snapshot.errors)} devices or sensor entries with malformed data on gateway {self.gateway_id}: {snapshot.errors}"  # noqa: G004
+            )
+
+        self._poll_interval.record_poll(
+            self.data is None or snapshot.values != self.data.values
+        )
+        self._set_next_interval(self._next_interval())
+        return snapshot
+
+    def _next_interval(self) -> timedelta:
+        """Get the delay until the next poll, or probe of an unhealthy gateway."""
+        if self._health.healthy:
+            return self._poll_interval.next_interval
+        return self._health.probe_interval
+
+    def _record_health(self, success: bool) -> None:
+        """Record the result of a poll, logging when the gateway's health changes."""
+        was_healthy = self._health.healthy
+        self._health.record_poll(success)
+        if was_healthy and not self._health.healthy:
+            _LOGGER.warning(
+                f"Dwelo gateway {self.gateway_id} keeps failing, probing it every {self._health.probe_interval} at most"  # noqa: G004
+            )
+        elif not was_healthy and self._health.healthy:
+            _LOGGER.info(f"Dwelo gateway {self.gateway_id} recovered")  # noqa: G004
+
+
+def _all_offline(device_metadata: dict[str, DweloDeviceMetadata]) -> bool:
+    """Return True if there are devices and all of them are offline."""
+    return bool(device_metadata) and not any(
+        metadata.is_online for metadata in device_metadata.values()
+    )
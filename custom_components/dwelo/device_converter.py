@@ -1,23 +1,188 @@
 """Contains functions to convert Dwelo device data to the expected format."""
 
-from .models import DweloThermostatData, DweloLockData, DweloLockState
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .models import (
+    DweloDeviceMetadata,
+    DweloDeviceType,
+    DweloGatewaySnapshot,
+    DweloLockData,
+    DweloLockState,
+    DweloThermostatData,
+    DweloThermostatMode,
+    DweloThermostatState,
+)
+
+# The sensor types each device type is converted from.
+THERMOSTAT_SENSOR_TYPES = ("temperature", "mode", "setToCool", "setToHeat", "state")
+LOCK_SENSOR_TYPES = ("lock",)
+
+
+def index_gateway_sensors(
+    gateway_data: any, errors: dict[str, str] | None = None
+) -> dict[str, dict[str, any]]:
+    """Group the sensors of a gateway response by device ID and sensor type.
+
+    This walks the gateway results exactly once, so every device on the
+    gateway can look up its own sensors without scanning the full list.
+    Entries without a device ID or sensor type are skipped and reported in
+    errors by their position in the results.
+    """
+    sensor_index = {}
+    if not gateway_data:
+        return sensor_index
+
+    for position, sensor in enumerate(gateway_data.get("results") or ()):
+        if not isinstance(sensor, dict):
+            device_id = sensor_type = None
+        else:
+            device_id = sensor.get("deviceId")
+            sensor_type = sensor.get("sensorType")
+        if device_id is None or sensor_type is None:
+            if errors is not None:
+                errors[f"results[{position}]"] = f"malformed sensor entry: {sensor!r}"
+            continue
+
+        device_sensors = sensor_index.get(device_id)
+        if device_sensors is None:
+            device_sensors = sensor_index[device_id] = {}
+        device_sensors[sensor_type] = sensor
+
+    return sensor_index
+
+
+def sensor_values(
+    device_sensors: dict[str, any] | None, sensor_types: tuple[str, ...]
+) -> tuple | None:
+    """Get a compact, comparable tuple of the sensor values a device uses.
+
+    Raises KeyError if one of the sensors has no value.
+    """
+    if not device_sensors:
+        return None
+    return tuple(
+        sensor["value"] if (sensor := device_sensors.get(sensor_type)) else None
+        for sensor_type in sensor_types
+    )
 
 
 def convert_to_thermostat(dwelo_device_data: any):
-    """Convert a Dwelo device data to a DweloThermostatData object."""
+    """Convert a Dwelo device data to a DweloThermostatData object.
+
+    Mode and state are looked up as enum members, so every thermostat shares
+    the same objects instead of holding its own strings.
+    """
     return DweloThermostatData(
         current_temperature=float(dwelo_device_data["temperature"]["value"]),
-        mode=dwelo_device_data["mode"]["value"],
+        mode=DweloThermostatMode(dwelo_device_data["mode"]["value"]),
         target_temperature_cool=float(dwelo_device_data["setToCool"]["value"]),
         target_temperature_heat=float(dwelo_device_data["setToHeat"]["value"]),
-        state=dwelo_device_data["state"]["value"],
+        state=DweloThermostatState(dwelo_device_data["state"]["value"]),
     )
 
 
 def convert_to_lock(dwelo_device_data: any, metadata: any) -> DweloLockData:
-    """Convert a Dwelo device data to a DweloLockData object."""
-    return DweloLockData(
-        state=DweloLockState(dwelo_device_data["lock"]["value"]),
-        battery_level=int(dwelo_device_data["battery"]["value"]),
-        is_online=metadata.is_online
-    )
\ No newline at end of file
+    """Convert a Dwelo device data to a DweloLockData object.
+
+    Battery and connectivity have entities of their own, so a lock only
+    changes when it is locked or unlocked.
+    """
+    return DweloLockData(state=DweloLockState(dwelo_device_data["lock"]["value"]))
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceConverter:
+    """How to turn the sensors of one device type into typed device data."""
+
+    sensor_types: tuple[str, ...]
+    convert: Callable[[dict[str, any], DweloDeviceMetadata], any]
+
+
+# Converters by Dwelo device type. Devices of other types are left out of the
+# converted states but keep their raw sensors in the snapshot's sensor index.
+DEVICE_CONVERTERS: dict[str, DeviceConverter] = {
+    DweloDeviceType.THERMOSTAT.value: DeviceConverter(
+        THERMOSTAT_SENSOR_TYPES,
+        lambda sensors, metadata: convert_to_thermostat(sensors),
+    ),
+    DweloDeviceType.LOCK.value: DeviceConverter(LOCK_SENSOR_TYPES, convert_to_lock),
+}
+
+
+# Raw values of on/off style sensors, such as door contacts or leak detectors.
+TRUE_SENSOR_VALUES = frozenset(
+    {"true", "on", "open", "opened", "detected", "wet", "active", "yes", "1"}
+)
+FALSE_SENSOR_VALUES = frozenset(
+    {"false", "off", "closed", "clear", "dry", "inactive", "idle", "no", "0"}
+)
+
+
+def parse_bool(value: any) -> bool:
+    """Convert the raw value of an on/off style sensor."""
+    normalized = str(value).strip().lower()
+    if normalized in TRUE_SENSOR_VALUES:
+        return True
+    if normalized in FALSE_SENSOR_VALUES:
+        return False
+    raise ValueError(f"Not an on/off value: {value!r}")
+
+
+def is_extra_sensor(device_type: str, sensor_type: str) -> bool:
+    """Return True if a sensor is not already used by its device's converter.
+
+    Extra sensors get entities of their own; sensors a lock or thermostat is
+    converted from are shown by that entity instead.
+    """
+    converter = DEVICE_CONVERTERS.get(device_type)
+    return converter is None or sensor_type not in converter.sensor_types
+
+
+def convert_gateway(
+    gateway_data: any,
+    device_metadata: dict[str, DweloDeviceMetadata],
+    previous: DweloGatewaySnapshot | None = None,
+) -> DweloGatewaySnapshot:
+    """Convert a whole gateway response into typed states for its devices.
+
+    device_metadata holds the devices to convert by UID. A device whose sensor
+    values are the same as in previous keeps its previous state object without
+    being converted again. Devices with missing or malformed sensors are left
+    out of the states and reported in errors instead of raising.
+    """
+    errors = {}
+    sensor_index = index_gateway_sensors(gateway_data, errors)
+    states = {}
+    values = {}
+
+    for uid, metadata in device_metadata.items():
+        converter = DEVICE_CONVERTERS.get(metadata.device_type)
+        if converter is None:
+            continue
+
+        device_sensors = sensor_index.get(uid)
+        try:
+            device_values = sensor_values(device_sensors, converter.sensor_types)
+            if device_values is None:
+                errors[uid] = "no sensors reported"
+                continue
+
+            if (
+                previous is not None
+                and uid in previous.states
+                and previous.values.get(uid) == device_values
+            ):
+                states[uid] = previous.states[uid]
+                values[uid] = device_values
+                continue
+
+            states[uid] = converter.convert(device_sensors, metadata)
+        except (KeyError, TypeError, ValueError) as err:
+            errors[uid] = f"{type(err).__name__}: {err}"
+            continue
+        values[uid] = device_values
+
+    return DweloGatewaySnapshot(
+        sensor_index=sensor_index, states=states, values=values, errors=errors
+    )
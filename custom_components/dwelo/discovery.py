@@ -0,0 +1,228 @@
+"""Incremental discovery of Dwelo devices."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from aiohttp import ClientError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .cache import DweloCache
+from .const import (
+    CONF_LOCK_SCAN_INTERVAL,
+    CONF_THERMOSTAT_SCAN_INTERVAL,
+    DEFAULT_LOCK_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_THERMOSTAT_SCAN_INTERVAL,
+    DOMAIN,
+    SIGNAL_DEVICE_REMOVED,
+    SIGNAL_DEVICE_UPDATED,
+    SIGNAL_DEVICES_ADDED,
+)
+from .coordinator import DweloGatewayCoordinator
+from .dwelo_client import DweloAuthError, DweloClient
+from .models import DweloData, DweloDeviceMetadata, DweloDeviceType
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def group_by_gateway(
+    device_metadata: dict[str, DweloDeviceMetadata],
+) -> dict[str, dict[str, DweloDeviceMetadata]]:
+    """Group device metadata by gateway ID."""
+    gateway_devices = {}
+    for uid, metadata in device_metadata.items():
+        gateway_devices.setdefault(metadata.gateway_id, {})[uid] = metadata
+    return gateway_devices
+
+
+def create_coordinators(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    client: DweloClient,
+    device_metadata: dict[str, DweloDeviceMetadata],
+) -> dict[str, DweloGatewayCoordinator]:
+    """Create a coordinator for every gateway with devices.
+
+    One coordinator per gateway, so each gateway is fetched once per cycle no
+    matter how many devices are attached to it.
+    """
+    base_intervals = _gateway_base_intervals(entry, device_metadata)
+    return {
+        gateway_id: DweloGatewayCoordinator(
+            hass,
+            client,
+            gateway_id,
+            devices,
+            base_intervals.get(gateway_id, DEFAULT_SCAN_INTERVAL),
+        )
+        for gateway_id, devices in group_by_gateway(device_metadata).items()
+    }
+
+
+def _gateway_base_intervals(
+    entry: ConfigEntry, device_metadata: dict[str, DweloDeviceMetadata]
+) -> dict[str, timedelta]:
+    """Get the base poll interval of each gateway.
+
+    A gateway is polled as often as its most demanding device type needs.
+    """
+    intervals_by_type = {
+        DweloDeviceType.LOCK.value: timedelta(
+            seconds=entry.options.get(
+                CONF_LOCK_SCAN_INTERVAL, DEFAULT_LOCK_SCAN_INTERVAL
+            )
+        ),
+        DweloDeviceType.THERMOSTAT.value: timedelta(
+            seconds=entry.options.get(
+                CONF_THERMOSTAT_SCAN_INTERVAL, DEFAULT_THERMOSTAT_SCAN_INTERVAL
+            )
+        ),
+    }
+
+    base_intervals = {}
+    for metadata in device_metadata.values():
+        interval = intervals_by_type.get(metadata.device_type)
+        if interval is None:
+            continue
+        current = base_intervals.get(metadata.gateway_id)
+        if current is None or interval < current:
+            base_intervals[metadata.gateway_id] = interval
+    return base_intervals
+
+
+async def async_get_devices(
+    client: DweloClient,
+) -> dict[str, DweloDeviceMetadata] | None:
+    """Get all devices, or None if discovery failed."""
+    try:
+        return await client.get_devices()
+    except (ClientError, TimeoutError, DweloAuthError) as err:
+        _LOGGER.warning(f"Dwelo device discovery failed: {err}")  # noqa: G004
+        return None
+
+
+class DweloDiscovery:
+    """Keeps the devices of a config entry in sync with the Dwelo account.
+
+    Every discovery is diffed against DweloData.device_metadata. Added and
+    removed devices are announced over the dispatcher so the platforms can add
+    or remove just their entities, metadata changes go straight to the
+    entities of the device, and gateways get coordinators as they come and go.
+    The entities of a device that moves to another gateway follow it to the
+    new coordinator. A device that changes type is announced as added, so it
+    gets the entities of its new type, and entities of the old type remove
+    themselves.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        data: DweloData,
+        cache: DweloCache,
+    ) -> None:
+        """Create the discovery of a config entry."""
+        self._hass = hass
+        self._entry = entry
+        self._data = data
+        self._cache = cache
+
+    async def async_discover(self) -> bool:
+        """Fetch the device listing and apply it, returning False on failure."""
+        device_metadata = await async_get_devices(self._data.client)
+        if device_metadata is None:
+            return False
+        self.async_apply(device_metadata)
+        return True
+
+    @callback
+    def async_apply(self, device_metadata: dict[str, DweloDeviceMetadata]) -> None:
+        """Apply a fresh device listing to the running entry."""
+        previous = self._data.device_metadata
+        removed = previous.keys() - device_metadata.keys()
+        changed = [
+            metadata
+            for uid, metadata in device_metadata.items()
+            if uid in previous and metadata != previous[uid]
+        ]
+        # A device that changed type needs the entities of its new type.
+        added = [
+            metadata
+            for uid, metadata in device_metadata.items()
+            if uid not in previous
+            or metadata.device_type != previous[uid].device_type
+        ]
+        if not (added or removed or changed):
+            return
+
+        _LOGGER.info(
+            f"Dwelo devices changed: {len(added)} added, {len(removed)} removed, {len(changed)} updated"  # noqa: G004
+        )
+        self._data.device_metadata = device_metadata
+        self._cache.async_set_devices(device_metadata)
+
+        for uid in removed:
+            self._data.command_tracker.async_resolve(uid)
+            async_dispatcher_send(self._hass, SIGNAL_DEVICE_REMOVED.format(uid))
+
+        self._async_update_coordinators(device_metadata)
+
+        for metadata in changed:
+            old = previous[metadata.uid]
+            if (
+                metadata.gateway_id != old.gateway_id
+                or metadata.device_type != old.device_type
+            ):
+                # Pending commands were tracked on the old gateway or type.
+                self._data.command_tracker.async_resolve(metadata.uid)
+            async_dispatcher_send(
+                self._hass,
+                SIGNAL_DEVICE_UPDATED.format(metadata.uid),
+                metadata,
+                self._data.coordinators[metadata.gateway_id],
+            )
+        if added:
+            async_dispatcher_send(
+                self._hass, SIGNAL_DEVICES_ADDED.format(self._entry.entry_id), added
+            )
+
+    @callback
+    def _async_update_coordinators(
+        self, device_metadata: dict[str, DweloDeviceMetadata]
+    ) -> None:
+        """Create, update and shut down gateway coordinators to match."""
+        coordinators = self._data.coordinators
+        gateway_devices = group_by_gateway(device_metadata)
+
+        for gateway_id in coordinators.keys() - gateway_devices.keys():
+            coordinator = coordinators.pop(gateway_id)
+            self._cache.async_forget_gateway(gateway_id)
+            self._entry.async_create_background_task(
+                self._hass,
+                coordinator.async_shutdown(),
+                f"{DOMAIN} shut down gateway {gateway_id}",
+            )
+
+        new_devices = {}
+        for gateway_id, devices in gateway_devices.items():
+            if (coordinator := coordinators.get(gateway_id)) is None:
+                new_devices.update(devices)
+            elif devices != coordinator.device_metadata:
+                coordinator.async_set_device_metadata(devices)
+
+        new_coordinators = create_coordinators(
+            self._hass, self._entry, self._data.client, new_devices
+        )
+        for gateway_id, coordinator in new_coordinators.items():
+            coordinators[gateway_id] = coordinator
+            self._entry.async_on_unload(self._cache.async_track(coordinator))
+            self._entry.async_create_background_task(
+                self._hass,
+                coordinator.async_refresh(),
+                f"{DOMAIN} first poll of gateway {gateway_id}",
+            )
@@ -1,17 +1,65 @@
+import asyncio
+import codecs
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+import hashlib
+from http import HTTPStatus
+import json
 import logging
+import sys
+import time
 
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import ClientError, ClientResponse, ClientSession, ClientTimeout
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
+from .auth import is_token_fresh
+from .coalescing import ResponseCache, SingleFlight
 from .device_converter import convert_to_thermostat, convert_to_lock
-from .models import DweloDeviceMetadata
+from .models import DweloClientMetrics, DweloDeviceMetadata, DweloToken
+from .resilience import (
+    RETRYABLE_STATUSES,
+    CircuitBreaker,
+    RequestTimeouts,
+    RetryPolicy,
+    parse_retry_after,
+)
+from .scheduler import DweloRequestScheduler, RequestPriority, TokenBucket
+from .streaming import ResultsStreamParser
 
 _LOGGER = logging.getLogger(__name__)
 
 APPLICATION_ID = "concierge"
 
+# Size of the chunks read from the network in streaming mode.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Fields of a device listing entry that _response_entry_to_device uses.
+DEVICE_FIELDS = (
+    "uid",
+    "deviceType",
+    "givenName",
+    "gatewayId",
+    "isActive",
+    "isOnline",
+    "dateRegistered",
+)
+
+# Devices asked for per page of the device listing, and how many pages are
+# fetched at once after the first one.
+DEVICE_PAGE_SIZE = 100
+DEVICE_PAGE_CONCURRENCY = 4
+
+# Returned by get_if_changed when the body matches the previous response.
+NOT_MODIFIED = object()
+
+# Returned by get_if_changed when the request was never sent, because the
+# circuit breaker held it back or its deadline passed while it was queued.
+NOT_SENT = object()
+
+# Statuses that mean the bearer token is no longer accepted.
+AUTH_FAILURE_STATUSES = frozenset({HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN})
+
 
 class DweloClient:
     """The Dwelo client for interfacing with the Dwelo API."""
@@ -26,17 +74,54 @@ class DweloClient:
         hass: HomeAssistant,
         email: str,
         password: str,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeouts: RequestTimeouts | None = None,
+        stream_responses: bool = False,
+        scheduler: DweloRequestScheduler | None = None,
+        rate_limiter: TokenBucket | None = None,
+        response_cache: ResponseCache | None = None,
+        token: DweloToken | None = None,
+        token_listener: Callable[[DweloToken], None] | None = None,
     ) -> None:
-        """Create a Dwelo client."""
+        """Create a Dwelo client.
+
+        token is a bearer token from an earlier login; it is used until the
+        API rejects it, unless it is already older than its known lifetime.
+        token_listener is called with every new token, e.g. to store it.
+        """
         self._host = host if host.endswith("/") else host + "/"
         self._email = email
         self._password = password
         self._session: ClientSession = async_create_clientsession(hass)
 
         # Dwelo seems to operate on gateways. Exactly what that is, I'm not sure,
-        # but every device has a parent gateway. These are currently tracked but unused
-        self._registered_gateways = set()
+        # but every device has a parent gateway. Sensor data is polled per gateway.
+        self._device_gateways: dict[str, str] = {}
         self._bearer_token = None
+        self._token_issued: float | None = None
+        self._token_lifetime: float | None = None
+        # The last token the API accepted, to tell expiry from other rejections.
+        self._accepted_token: str | None = None
+        if token is not None:
+            self._token_lifetime = token.lifetime
+            if is_token_fresh(token):
+                self._bearer_token = token.token
+                self._token_issued = token.issued_at
+        self._token_listener = token_listener
+        # Serializes logins so concurrent auth failures share a single re-login.
+        self._login_lock = asyncio.Lock()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._timeouts = timeouts or RequestTimeouts()
+        self._metrics = DweloClientMetrics()
+        self._etags: dict[str, str] = {}
+        self._stream_responses = stream_responses
+        self._scheduler = scheduler or DweloRequestScheduler()
+        # Usually shared with the clients of other accounts.
+        self._rate_limiter = rate_limiter
+        self._in_flight = SingleFlight()
+        self._responses = response_cache or ResponseCache()
 
     async def login(self) -> bool:
         """Login to the Dwelo API."""
@@ -48,6 +133,7 @@ class DweloClient:
                 "password": self._password,
                 "applicationId": APPLICATION_ID,
             },
+            timeout=ClientTimeout(total=self._timeouts.login),
         )
 
         if not response.ok:
@@ -57,12 +143,51 @@ class DweloClient:
         _LOGGER.info(f"Dwelo auth success: {response.status}")  # noqa: G004
         response_json = await response.json()
         self._bearer_token = response_json["token"]
+        self._token_issued = time.time()
+        if self._token_listener is not None:
+            self._token_listener(self.token)
         return True
 
+    @property
+    def token(self) -> DweloToken | None:
+        """Get the current bearer token, or None before the first login."""
+        if not self._bearer_token or self._token_issued is None:
+            return None
+        return DweloToken(
+            token=self._bearer_token,
+            issued_at=self._token_issued,
+            lifetime=self._token_lifetime,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return False while the Dwelo API is considered down."""
+        return self._circuit_breaker.available
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Get the circuit breaker guarding the Dwelo API."""
+        return self._circuit_breaker
+
+    @property
+    def timeouts(self) -> RequestTimeouts:
+        """Get the request timeouts used by the client."""
+        return self._timeouts
+
+    @property
+    def stream_responses(self) -> bool:
+        """Return True if large list responses should be parsed as a stream."""
+        return self._stream_responses
+
+    @property
+    def metrics(self) -> DweloClientMetrics:
+        """Get the traffic counters of the client."""
+        return self._metrics
+
     def _response_entry_to_device(self, entry) -> DweloDeviceMetadata:
         return DweloDeviceMetadata(
             uid=entry["uid"],
-            device_type=entry["deviceType"],
+            device_type=sys.intern(entry["deviceType"]),
             given_name=entry["givenName"],
             gateway_id=entry["gatewayId"],
             is_active=entry["isActive"],
@@ -70,6 +195,47 @@ class DweloClient:
             date_registered=entry["dateRegistered"],
         )
 
+    def _polled_gateway(self, endpoint: str) -> str | None:
+        """Get the gateway an endpoint polls, if it is a gateway endpoint."""
+        if endpoint.startswith(self.GATEWAY_ENDPOINT):
+            return endpoint[len(self.GATEWAY_ENDPOINT) :]
+        return None
+
+    def _commanded_gateway(self, endpoint: str, gateway_id: str | None) -> str | None:
+        """Get the gateway a device command goes to, if it is known."""
+        if gateway_id is not None or not endpoint.startswith(self.DEVICE_ENDPOINT):
+            return gateway_id
+        uid = endpoint[len(self.DEVICE_ENDPOINT) :].split("/", 1)[0]
+        return self._device_gateways.get(uid)
+
+    def _invalidate(self, endpoint: str) -> None:
+        """Make the next read of an endpoint go to the API."""
+        self._responses.invalidate(endpoint)
+        self._in_flight.forget(endpoint)
+
+    async def _coalesced(
+        self,
+        key: tuple,
+        deadline: float | None,
+        call: Callable[[], Awaitable[any]],
+    ) -> any:
+        """Run a read, sharing it with identical reads already in flight.
+
+        The caller that starts a read passes its deadline on to the request.
+        Callers that join it keep their own deadline.
+        """
+        if not self._in_flight.is_in_flight(key):
+            return await self._in_flight.run(key, call)
+
+        self._metrics.coalesced_requests += 1
+        try:
+            async with asyncio.timeout_at(deadline):
+                return await self._in_flight.run(key, call)
+        except TimeoutError:
+            self._metrics.deadlines_exceeded += 1
+            _LOGGER.warning(f"Dwelo API request to {key[0]} ran out of time")  # noqa: G004
+            return None
+
     def _transform_endpoint(self, endpoint: str) -> str:
         """Transform an endpoint to the correct format."""
         return f"{self._host}{endpoint}"
@@ -80,7 +246,11 @@ class DweloClient:
             raise MissingBearerToken
         return {"authorization": self._bearer_token}
 
-    async def _handle_dwelo_response(self, response: ClientResponse):
+    async def _handle_dwelo_response(
+        self,
+        response: ClientResponse,
+        body_reader: Callable[[ClientResponse], Awaitable[any]] | None = None,
+    ):
         """Handle a Dwelo API response and get the json body."""
         if not response.ok:
             _LOGGER.error(f"Dwelo API returned an error: {response}")  # noqa: G004
@@ -88,45 +258,503 @@ class DweloClient:
 
         _LOGGER.debug(f"Dwelo successful response: {response.status}")  # noqa: G004
 
+        if body_reader is not None:
+            return await body_reader(response)
         return await response.json()
 
-    async def get(self, endpoint: str) -> any:
-        """Make a GET request to the Dwelo API."""
-        _LOGGER.debug(f"Making request to Dwelo API endpoint {endpoint}")  # noqa: G004
-        response = await self._session.get(
-            self._transform_endpoint(endpoint), headers=self._get_headers()
-        )
+    def _streaming_reader(
+        self,
+        keep: Callable[[dict], bool] | None,
+        fields: Iterable[str] | None,
+        hasher: any = None,
+    ) -> Callable[[ClientResponse], Awaitable[any]]:
+        """Create a body reader that parses the results array as it arrives.
 
-        return await self._handle_dwelo_response(response)
+        Only the results that pass keep, reduced to fields, are held in memory.
+        Every chunk is also fed to hasher, if given.
+        """
 
-    async def post(self, endpoint: str, json_payload: object) -> any:
-        """Make a POST request to the Dwelo API."""
-        _LOGGER.debug(
-            f"Making request to Dwelo API endpoint {endpoint} with payload: {json_payload}"  # noqa: G004
+        async def _read_body(response: ClientResponse) -> any:
+            parser = ResultsStreamParser(keep=keep, fields=fields)
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    parser.feed(decoder.decode(chunk))
+                parser.feed(decoder.decode(b"", final=True))
+                return parser.result()
+            except ValueError as err:
+                _LOGGER.error(f"Malformed Dwelo API response: {err}")  # noqa: G004
+                return None
+
+        return _read_body
+
+    async def _async_relogin(self, rejected_token: str | None, status: int) -> bool:
+        """Log in again after the given token was rejected with status.
+
+        Only the first caller to get the lock actually logs in. Everyone who
+        was rejected with the same token waits for that login and then reuses
+        the new token.
+        """
+        async with self._login_lock:
+            if self._bearer_token and self._bearer_token != rejected_token:
+                return True
+            if (
+                status == HTTPStatus.UNAUTHORIZED
+                and rejected_token == self._accepted_token
+                and self._token_issued is not None
+            ):
+                # A token that worked before has expired. Remember how long
+                # tokens last, so a stored token that is about to expire is not
+                # tried after a restart. A 403 may just be a refused command.
+                self._token_lifetime = time.time() - self._token_issued
+            _LOGGER.info("Dwelo token was rejected, logging in again")
+            self._metrics.relogins += 1
+            return await self.login()
+
+    async def _send_authorized(
+        self,
+        method: str,
+        endpoint: str,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ) -> ClientResponse:
+        """Send a single request, logging in again once if the token expired."""
+        for attempt in range(2):
+            if self._login_lock.locked():
+                # A re-login is in flight, wait for the fresh token.
+                async with self._login_lock:
+                    pass
+
+            if not self._bearer_token:
+                # Nobody logged in yet, e.g. when starting from the cache.
+                async with self._login_lock:
+                    if not self._bearer_token and not await self.login():
+                        raise DweloAuthError("Dwelo login failed")
+
+            token = self._bearer_token
+            response = await self._session.request(
+                method,
+                self._transform_endpoint(endpoint),
+                headers={**(headers or {}), **self._get_headers()},
+                **kwargs,
+            )
+
+            if attempt == 0 and response.status in AUTH_FAILURE_STATUSES:
+                response.release()
+                if not await self._async_relogin(token, response.status):
+                    raise DweloAuthError("Dwelo re-login failed")
+                continue
+
+            if response.status not in AUTH_FAILURE_STATUSES:
+                self._accepted_token = token
+            return response
+
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        timeout: float,
+        deadline: float | None = None,
+        body_reader: Callable[[ClientResponse], Awaitable[any]] | None = None,
+        priority: RequestPriority = RequestPriority.DISCOVERY,
+        gateway_id: str | None = None,
+        not_sent: any = None,
+        **kwargs,
+    ) -> any:
+        """Make an authorized request with retries behind the circuit breaker.
+
+        Each attempt is limited to timeout seconds, and none is started or
+        retried once the loop time passes deadline. Returns not_sent if the
+        circuit breaker holds the request back or it runs out of time queued.
+        """
+        if not self._circuit_breaker.allow_request():
+            self._metrics.circuit_rejections += 1
+            _LOGGER.debug(f"Dwelo API circuit is open, skipping {endpoint}")  # noqa: G004
+            return not_sent
+
+        self._metrics.requests += 1
+        try:
+            return await self._request_with_retries(
+                method,
+                endpoint,
+                timeout,
+                deadline,
+                body_reader,
+                priority,
+                gateway_id,
+                not_sent,
+                **kwargs,
+            )
+        except BaseException:
+            # Cancelled requests record nothing, so free the probe slot for the
+            # next caller.
+            self._circuit_breaker.release_probe()
+            raise
+
+    async def _request_with_retries(
+        self,
+        method: str,
+        endpoint: str,
+        timeout: float,
+        deadline: float | None,
+        body_reader: Callable[[ClientResponse], Awaitable[any]] | None,
+        priority: RequestPriority,
+        gateway_id: str | None,
+        not_sent: any,
+        **kwargs,
+    ) -> any:
+        """Send a request, retrying transient failures with backoff.
+
+        Every attempt waits for a rate limit token and a scheduler slot of the
+        given priority, and for its gateway if one is given. Only attempts that
+        were sent with their full timeout count against the circuit breaker, so
+        local queueing never makes the API look down.
+        """
+        loop = asyncio.get_running_loop()
+        retry = 0
+        while True:
+            # Only the attempt itself holds a slot; neither the wait for a rate
+            # limit token nor the backoff sleep does.
+            try:
+                async with asyncio.timeout_at(deadline):
+                    if self._rate_limiter is not None:
+                        await self._rate_limiter.acquire(priority)
+                    await self._scheduler.acquire(priority, gateway_id)
+            except TimeoutError:
+                return self._ran_out_of_time(endpoint, retry > 0, not_sent)
+
+            try:
+                attempt_timeout = timeout
+                if deadline is not None:
+                    attempt_timeout = min(timeout, deadline - loop.time())
+
+                response = None
+                try:
+                    response = await self._send_authorized(
+                        method,
+                        endpoint,
+                        timeout=ClientTimeout(total=attempt_timeout),
+                        **kwargs,
+                    )
+                except DweloAuthError as err:
+                    # The API answered, so this is not an outage.
+                    self._circuit_breaker.record_success()
+                    self._metrics.failures += 1
+                    _LOGGER.error(f"{err} for endpoint {endpoint}")  # noqa: G004
+                    return None
+                except TimeoutError as err:
+                    self._metrics.timeouts += 1
+                    if attempt_timeout < timeout:
+                        # The deadline cut the attempt short, so the timeout
+                        # says more about the queue than about the API.
+                        return self._ran_out_of_time(endpoint, retry > 0, not_sent)
+                    error = err
+                except ClientError as err:
+                    error = err
+
+                if response is not None and response.status not in RETRYABLE_STATUSES:
+                    self._circuit_breaker.record_success()
+                    return await self._handle_dwelo_response(response, body_reader)
+
+                retry_after = None
+                if response is not None:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self._retry_policy.backoff(retry, retry_after)
+                out_of_time = deadline is not None and loop.time() + delay >= deadline
+
+                if retry + 1 >= self._retry_policy.max_attempts or out_of_time:
+                    self._circuit_breaker.record_failure()
+                    self._metrics.failures += 1
+                    if response is None:
+                        _LOGGER.error(
+                            f"Dwelo API request to {endpoint} failed: {error!r}"  # noqa: G004
+                        )
+                        return None
+                    return await self._handle_dwelo_response(response, body_reader)
+
+                if response is not None:
+                    response.release()
+                _LOGGER.debug(
+                    f"Retrying Dwelo API request to {endpoint} in {delay:.2f}s"  # noqa: G004
+                )
+            finally:
+                self._scheduler.release(gateway_id)
+            self._metrics.retries += 1
+            retry += 1
+            await asyncio.sleep(delay)
+
+    def _ran_out_of_time(
+        self, endpoint: str, attempt_failed: bool, not_sent: any
+    ) -> any:
+        """Give up on a request whose deadline passed before it could finish.
+
+        Only an earlier attempt that failed on its own counts against the
+        circuit breaker; otherwise the request is dropped as not sent.
+        """
+        self._metrics.deadlines_exceeded += 1
+        _LOGGER.warning(f"Dwelo API request to {endpoint} ran out of time")  # noqa: G004
+        if not attempt_failed:
+            self._circuit_breaker.release_probe()
+            return not_sent
+        self._circuit_breaker.record_failure()
+        self._metrics.failures += 1
+        return None
+
+    async def get(
+        self,
+        endpoint: str,
+        *,
+        timeout: float | None = None,
+        deadline: float | None = None,
+        stream: bool = False,
+        keep: Callable[[dict], bool] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> any:
+        """Make a GET request to the Dwelo API, shared and briefly cached."""
+        if fields is not None:
+            fields = tuple(fields)
+        if not stream and (cached := self._responses.get(endpoint)) is not None:
+            # Cached bodies are shared between callers and must not be modified.
+            self._metrics.cache_hits += 1
+            return cached[0]
+
+        gateway_id = self._polled_gateway(endpoint)
+        if timeout is None:
+            timeout = (
+                self._timeouts.poll
+                if gateway_id is not None
+                else self._timeouts.discovery
+            )
+        body_reader = self._streaming_reader(keep, fields) if stream else None
+        stamp = self._responses.begin()
+
+        async def _fetch() -> any:
+            _LOGGER.debug(f"Making request to Dwelo API endpoint {endpoint}")  # noqa: G004
+            response = await self._request(
+                "GET",
+                endpoint,
+                timeout,
+                deadline,
+                body_reader=body_reader,
+                priority=(
+                    RequestPriority.POLL
+                    if gateway_id is not None
+                    else RequestPriority.DISCOVERY
+                ),
+                gateway_id=gateway_id,
+            )
+            if response is not None and not stream:
+                # get_if_changed shares the cache, so the digest goes along.
+                self._responses.put(endpoint, (response, None), stamp)
+            return response
+
+        return await self._coalesced(
+            (endpoint, "get", stream, keep, fields), deadline, _fetch
         )
-        response = await self._session.post(
-            self._transform_endpoint(endpoint),
-            headers=self._get_headers(),
-            json=json_payload,
+
+    async def get_if_changed(
+        self,
+        endpoint: str,
+        digest: str | None,
+        *,
+        timeout: float | None = None,
+        deadline: float | None = None,
+        stream: bool = False,
+        keep: Callable[[dict], bool] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> tuple[any, str | None] | object | None:
+        """Make a GET request, returning (NOT_MODIFIED, digest) if nothing changed."""
+        if fields is not None:
+            fields = tuple(fields)
+        if not stream and (cached := self._responses.get(endpoint)) is not None:
+            self._metrics.cache_hits += 1
+            payload, cached_digest = cached
+            if cached_digest is not None and cached_digest == digest:
+                return NOT_MODIFIED, digest
+            return payload, cached_digest
+
+        headers = {}
+        if digest is not None and (etag := self._etags.get(endpoint)):
+            headers["If-None-Match"] = etag
+
+        async def _read_body(response: ClientResponse) -> tuple[any, str | None]:
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                return NOT_MODIFIED, digest
+            if etag := response.headers.get("ETag"):
+                self._etags[endpoint] = etag
+
+            hasher = hashlib.blake2b(digest_size=16)
+            if stream:
+                payload = await self._streaming_reader(keep, fields, hasher)(response)
+                if payload is None:
+                    return None
+                new_digest = hasher.hexdigest()
+                return (NOT_MODIFIED if new_digest == digest else payload), new_digest
+
+            body = await response.read()
+            hasher.update(body)
+            new_digest = hasher.hexdigest()
+            if new_digest == digest:
+                return NOT_MODIFIED, digest
+            return json.loads(body), new_digest
+
+        stamp = self._responses.begin()
+
+        async def _fetch() -> tuple[any, str | None] | object | None:
+            _LOGGER.debug(f"Making request to Dwelo API endpoint {endpoint}")  # noqa: G004
+            result = await self._request(
+                "GET",
+                endpoint,
+                timeout or self._timeouts.poll,
+                deadline,
+                body_reader=_read_body,
+                priority=RequestPriority.POLL,
+                gateway_id=self._polled_gateway(endpoint),
+                not_sent=NOT_SENT,
+                headers=headers,
+            )
+            if (
+                not stream
+                and isinstance(result, tuple)
+                and result[0]
+                and result[0] is not NOT_MODIFIED
+            ):
+                self._responses.put(endpoint, result, stamp)
+            return result
+
+        return await self._coalesced(
+            (endpoint, "get_if_changed", digest, stream, keep, fields),
+            deadline,
+            _fetch,
         )
 
-        return await self._handle_dwelo_response(response)
+    async def post(
+        self,
+        endpoint: str,
+        json_payload: object,
+        *,
+        timeout: float | None = None,
+        deadline: float | None = None,
+        gateway_id: str | None = None,
+    ) -> any:
+        """Make a POST request to the Dwelo API.
 
-    async def get_devices(self) -> dict[str, DweloDeviceMetadata]:
-        """Get all devices from the Dwelo API."""
-        device_details = await self.get(self.DEVICE_ENDPOINT)
-        if not device_details:
-            return {}
+        POSTs are device commands, so they are scheduled ahead of polls and
+        discovery. gateway_id is the gateway of the device; without it the
+        gateway is looked up from the last discovery. Once the command is
+        sent, cached and in-flight reads of that gateway are dropped.
+        """
+        _LOGGER.debug(
+            f"Making request to Dwelo API endpoint {endpoint} with payload: {json_payload}"  # noqa: G004
+        )
+        gateway_id = self._commanded_gateway(endpoint, gateway_id)
+        try:
+            return await self._request(
+                "POST",
+                endpoint,
+                timeout or self._timeouts.command,
+                deadline,
+                priority=RequestPriority.COMMAND,
+                gateway_id=gateway_id,
+                json=json_payload,
+            )
+        finally:
+            if gateway_id is not None:
+                self._invalidate(f"{self.GATEWAY_ENDPOINT}{gateway_id}")
 
+    async def get_devices(self) -> dict[str, DweloDeviceMetadata] | None:
+        """Get all devices from the Dwelo API, or None if the request failed."""
         grouped_devices = {}
-        for dev in device_details["results"]:
-            mapped_device = self._response_entry_to_device(dev)
-            grouped_devices[dev["uid"]] = mapped_device
-            if mapped_device.gateway_id not in self._registered_gateways:
-                self._registered_gateways.add(mapped_device.gateway_id)
+        try:
+            async for mapped_device in self.iter_devices():
+                grouped_devices[mapped_device.uid] = mapped_device
+        except DweloListingError as err:
+            _LOGGER.error(f"Dwelo device discovery failed: {err}")  # noqa: G004
+            return None
 
+        self._device_gateways = {
+            uid: metadata.gateway_id for uid, metadata in grouped_devices.items()
+        }
         return grouped_devices
 
+    async def iter_devices(
+        self, concurrency: int = DEVICE_PAGE_CONCURRENCY
+    ) -> AsyncIterator[DweloDeviceMetadata]:
+        """Yield every device of the account as soon as its page arrives.
+
+        The first page tells the total count, after which the remaining pages
+        are fetched concurrently, at most concurrency at a time. Without a
+        count the next links are followed one by one. Raises DweloListingError
+        if any page fails, so a partial listing is never taken for the whole.
+        """
+        page = await self._get_device_page(self._device_page_endpoint(0))
+        for dev in page["results"]:
+            yield self._response_entry_to_device(dev)
+        if not page.get("next"):
+            return
+
+        count = page.get("count")
+        page_size = len(page["results"])
+        if isinstance(count, int) and page_size:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+
+            async def _get_page(offset: int) -> dict:
+                async with semaphore:
+                    return await self._get_device_page(
+                        self._device_page_endpoint(offset, page_size)
+                    )
+
+            tasks = [
+                asyncio.create_task(_get_page(offset))
+                for offset in range(page_size, count, page_size)
+            ]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    for dev in (await next_page)["results"]:
+                        yield self._response_entry_to_device(dev)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # Retrieve what the other pages ended with, errors included.
+                await asyncio.gather(*tasks, return_exceptions=True)
+            return
+
+        while next_url := page.get("next"):
+            page = await self._get_device_page(self._relative_endpoint(next_url))
+            for dev in page["results"]:
+                yield self._response_entry_to_device(dev)
+
+    def _device_page_endpoint(
+        self, offset: int, limit: int = DEVICE_PAGE_SIZE
+    ) -> str:
+        """Get the endpoint of a page of the device listing."""
+        return f"{self.DEVICE_ENDPOINT}?limit={limit}&offset={offset}"
+
+    def _relative_endpoint(self, url: str) -> str:
+        """Turn a next link of the API into an endpoint."""
+        return url.removeprefix(self._host)
+
+    async def _get_device_page(self, endpoint: str) -> dict:
+        """Get one page of the device listing."""
+        page = await self.get(
+            endpoint, stream=self._stream_responses, fields=DEVICE_FIELDS
+        )
+        if not page or not isinstance(page.get("results"), list):
+            raise DweloListingError(f"Failed to get {endpoint}")
+        return page
+
 
 class MissingBearerToken(Exception):
-    """Raised when the bearer token is missing."""
\ No newline at end of file
+    """Raised when the bearer token is missing."""
+
+
+class DweloAuthError(Exception):
+    """Raised when the Dwelo API rejects our credentials."""
+
+
+class DweloListingError(Exception):
+    """Raised when a page of a Dwelo listing could not be fetched."""
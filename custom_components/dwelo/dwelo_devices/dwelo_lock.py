@@ -2,9 +2,13 @@
 
 import logging
 
-from ..device_converter import convert_to_lock
 from ..dwelo_client import DweloClient
-from ..models import DweloDeviceMetadata, DweloLockData, DweloLockState
+from ..models import (
+    DweloDeviceMetadata,
+    DweloGatewaySnapshot,
+    DweloLockData,
+    DweloLockState,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,14 +32,16 @@ class DweloLockDevice:
         self._device_data = device_data
 
     @classmethod
-    async def from_metadata(
-        cls, client: DweloClient, device_metadata: DweloDeviceMetadata
+    def from_snapshot(
+        cls,
+        client: DweloClient,
+        device_metadata: DweloDeviceMetadata,
+        snapshot: DweloGatewaySnapshot | None,
     ):
-        """Create a lock from a device."""
-        device_data = await cls._async_get_data(client, device_metadata)
-        if device_data:
-            return cls(client, device_metadata, device_data)
-        return None
+        """Create a lock from a converted gateway poll."""
+        device = cls(client, device_metadata, None)
+        device.update_from_snapshot(snapshot)
+        return device
 
     @property
     def data(self):
@@ -47,35 +53,23 @@ class DweloLockDevice:
         """Get the device metadata."""
         return self._device_metadata
 
-    @staticmethod
-    async def _async_get_data(
-        client: DweloClient, metadata: DweloDeviceMetadata
-    ) -> DweloLockData:
-        """Get the lock data for a given device."""
-        if metadata.device_type != "lock":
-            _LOGGER.error(f"Device is not a lock: {metadata}")
-            return None
-
-        gateway_data = await client.get(
-            f"{client.GATEWAY_ENDPOINT}{metadata.gateway_id}"
-        )
-        if not gateway_data:
-            _LOGGER.error(f"No gateway data for gateway ID {metadata.gateway_id}")
-            return None
-
-        device_data = {}
-        for sensor in gateway_data["results"]:
-            if sensor["deviceId"] == metadata.uid:
-                device_data[sensor["sensorType"]] = sensor
+    @metadata.setter
+    def metadata(self, device_metadata: DweloDeviceMetadata) -> None:
+        """Replace the device metadata after a discovery."""
+        self._device_metadata = device_metadata
 
-        return convert_to_lock(device_data, metadata)
+    def update_from_snapshot(self, snapshot: DweloGatewaySnapshot | None) -> bool:
+        """Update the lock data from a converted gateway poll.
 
-    async def async_update(self) -> DweloLockData:
-        """Get the lock data for a given device."""
-        self._device_data = await self._async_get_data(
-            self._client, self._device_metadata
-        )
-        return self._device_data
+        Returns False if the lock's state did not change.
+        """
+        device_data = None
+        if snapshot is not None:
+            device_data = snapshot.states.get(self._device_metadata.uid)
+        if device_data == self._device_data:
+            return False
+        self._device_data = device_data
+        return True
 
     async def set_lock_state(
         self, device_metadata: DweloDeviceMetadata, state: DweloLockState
@@ -99,6 +93,7 @@ class DweloLockDevice:
         response = await self._client.post(
             f"{self._client.DEVICE_ENDPOINT}{device_metadata.uid}/command/",
             {"command": command},
+            gateway_id=device_metadata.gateway_id,
         )
         _LOGGER.debug(f"Lock command response: {response}")
         if response is None:
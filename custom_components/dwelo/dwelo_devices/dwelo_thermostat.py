@@ -1,13 +1,21 @@
 """A module for Dwelo thermostat related objects."""
 
+import asyncio
 import logging
 
-from ..device_converter import convert_to_thermostat
 from ..dwelo_client import DweloClient
-from ..models import DweloDeviceMetadata, DweloThermostatData, DweloThermostatMode
+from ..models import (
+    DweloDeviceMetadata,
+    DweloGatewaySnapshot,
+    DweloThermostatData,
+    DweloThermostatMode,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# How long to wait for further changes before sending a thermostat command.
+COMMAND_DEBOUNCE_DELAY = 0.5
+
 
 class DweloThermostatDevice:
     """A class representing a Dwelo thermostat."""
@@ -27,14 +35,19 @@ class DweloThermostatDevice:
         self._client = client
         self._device_metadata = device_metadata
         self._device_data = device_data
+        self._command_queue = DweloThermostatCommandQueue(self)
 
     @classmethod
-    async def from_metadata(
-        cls, client: DweloClient, device_metadata: DweloDeviceMetadata
+    def from_snapshot(
+        cls,
+        client: DweloClient,
+        device_metadata: DweloDeviceMetadata,
+        snapshot: DweloGatewaySnapshot | None,
     ):
-        """Create a thermostat from a device."""
-        device_data = await cls._async_get_data(client, device_metadata)
-        return cls(client, device_metadata, device_data)
+        """Create a thermostat from a converted gateway poll."""
+        device = cls(client, device_metadata, None)
+        device.update_from_snapshot(snapshot)
+        return device
 
     @property
     def data(self):
@@ -46,34 +59,35 @@ class DweloThermostatDevice:
         """Get the device metadata."""
         return self._device_metadata
 
-    @staticmethod
-    async def _async_get_data(
-        client: DweloClient, metadata: DweloDeviceMetadata
-    ) -> DweloThermostatData:
-        """Get the thermostat data for a given device."""
-        if metadata.device_type != "thermostat":
-            _LOGGER.error(f"Device is not a thermostat: {metadata}")  # noqa: G004
-            return
+    @metadata.setter
+    def metadata(self, device_metadata: DweloDeviceMetadata) -> None:
+        """Replace the device metadata after a discovery."""
+        self._device_metadata = device_metadata
 
-        gateway_data = await client.get(
-            f"{client.GATEWAY_ENDPOINT}{metadata.gateway_id}"
-        )
-        if not gateway_data:
-            return None
+    def update_from_snapshot(self, snapshot: DweloGatewaySnapshot | None) -> bool:
+        """Update the thermostat data from a converted gateway poll.
 
-        device_data = {}
-        for sensor in gateway_data["results"]:
-            if sensor["deviceId"] == metadata.uid:
-                device_data[sensor["sensorType"]] = sensor
+        Returns False if the thermostat's state did not change.
+        """
+        device_data = None
+        if snapshot is not None:
+            device_data = snapshot.states.get(self._device_metadata.uid)
+        if device_data == self._device_data:
+            return False
+        self._device_data = device_data
+        return True
 
-        return convert_to_thermostat(device_data)
+    async def async_queue_command(
+        self,
+        mode: DweloThermostatMode | None = None,
+        setpoint: tuple[DweloThermostatMode, float] | None = None,
+    ) -> bool:
+        """Queue a mode change and/or setpoint, coalescing rapid changes.
 
-    async def async_update(self) -> DweloThermostatData:
-        """Get the thermostat data for a given device."""
-        self._device_data = await self._async_get_data(
-            self._client, self._device_metadata
-        )
-        return self.data
+        setpoint is a (mode, temperature) pair, see set_thermostat_temperature.
+        Returns once the latest queued values have been sent.
+        """
+        return await self._command_queue.async_submit(mode, setpoint)
 
     async def set_thermostat_temperature(
         self,
@@ -94,10 +108,15 @@ class DweloThermostatDevice:
             _LOGGER.error(f"Device is not a thermostat: {device_metadata}")  # noqa: G004
             return False
 
-        await self._client.post(
+        response = await self._client.post(
             f"{self._client.DEVICE_ENDPOINT}{device_metadata.uid}/command/",
-            {"command": mode, "commandValue": temperature},
+            {
+                "command": DweloThermostatMode(mode).value,
+                "commandValue": temperature,
+            },
+            gateway_id=device_metadata.gateway_id,
         )
+        return response is not None
 
     async def set_thermostat_mode(
         self, device_metadata: DweloDeviceMetadata, mode: DweloThermostatMode
@@ -107,7 +126,97 @@ class DweloThermostatDevice:
             _LOGGER.error(f"Device is not a thermostat: {device_metadata}")  # noqa: G004
             return False
 
-        await self._client.post(
+        response = await self._client.post(
             f"{self._client.DEVICE_ENDPOINT}{device_metadata.uid}/command/",
-            {"command": mode},
+            {"command": DweloThermostatMode(mode).value},
+            gateway_id=device_metadata.gateway_id,
         )
+        return response is not None
+
+
+class DweloThermostatCommandQueue:
+    """Debounces thermostat commands so only the latest values are sent.
+
+    Every submission restarts a short timer. When it fires, the latest requested
+    mode and setpoint are sent as one batch and every caller waiting on that batch
+    gets the same result.
+    """
+
+    def __init__(
+        self, device: DweloThermostatDevice, delay: float = COMMAND_DEBOUNCE_DELAY
+    ) -> None:
+        """Create a command queue for a thermostat."""
+        self._device = device
+        self._delay = delay
+        self._mode: DweloThermostatMode | None = None
+        self._setpoint: tuple[DweloThermostatMode, float] | None = None
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._send_lock = asyncio.Lock()
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def async_submit(
+        self,
+        mode: DweloThermostatMode | None,
+        setpoint: tuple[DweloThermostatMode, float] | None,
+    ) -> bool:
+        """Queue values to send and wait until the batch containing them is sent."""
+        if mode is not None:
+            self._mode = mode
+        if setpoint is not None:
+            self._setpoint = setpoint
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._timer:
+            self._timer.cancel()
+        self._timer = loop.call_later(self._delay, self._start_flush)
+        return await waiter
+
+    def _start_flush(self) -> None:
+        """Hand the queued values over to a send task."""
+        self._timer = None
+        mode, setpoint, waiters = self._mode, self._setpoint, self._waiters
+        self._mode, self._setpoint, self._waiters = None, None, []
+
+        task = asyncio.get_running_loop().create_task(
+            self._async_flush(mode, setpoint, waiters)
+        )
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _async_flush(
+        self,
+        mode: DweloThermostatMode | None,
+        setpoint: tuple[DweloThermostatMode, float] | None,
+        waiters: list[asyncio.Future],
+    ) -> None:
+        """Send a batch of queued values.
+
+        Both commands go to the same gateway, which takes one request at a
+        time, so they are sent one after the other: the mode first, then the
+        setpoint, which is skipped if the mode change failed. A batch with both
+        costs two round trips.
+        """
+        device = self._device
+        try:
+            # Batches go out one at a time so an older batch can never land last.
+            async with self._send_lock:
+                success = True
+                if mode is not None:
+                    success = await device.set_thermostat_mode(device.metadata, mode)
+                if success and setpoint is not None:
+                    setpoint_mode, temperature = setpoint
+                    success = await device.set_thermostat_temperature(
+                        device.metadata, temperature, setpoint_mode
+                    )
+        except Exception:
+            _LOGGER.exception(
+                f"Failed to send thermostat command for {device.metadata.uid}"  # noqa: G004
+            )
+            success = False
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(success)
@@ -0,0 +1,278 @@
+"""Base entities for Dwelo devices."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from functools import partial
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity, EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    DOMAIN,
+    SIGNAL_DEVICE_REMOVED,
+    SIGNAL_DEVICE_UPDATED,
+    SIGNAL_DEVICES_ADDED,
+)
+from .coordinator import DweloGatewayCoordinator
+from .device_converter import is_extra_sensor
+from .models import DweloData, DweloDeviceMetadata
+
+
+class DweloEntity(CoordinatorEntity[DweloGatewayCoordinator]):
+    """An entity of a Dwelo device that follows it through re-discovery.
+
+    Metadata changes found by discovery are applied in place, and a device
+    that moves to another gateway keeps its entity, which switches over to the
+    new gateway's coordinator. The entity removes itself, including its
+    registry entry, once the device is gone or the entity no longer applies to
+    it, e.g. a lock entity of a device that is now a thermostat.
+    """
+
+    def __init__(
+        self, coordinator: DweloGatewayCoordinator, metadata: DweloDeviceMetadata
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._metadata = metadata
+        self._remove_coordinator_listener: CALLBACK_TYPE | None = None
+        self._written_available: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Listen to the coordinator and discovery, and register for services."""
+        # Skip CoordinatorEntity's listener, which could not be moved to
+        # another coordinator; _async_set_coordinator manages it instead.
+        await super(CoordinatorEntity, self).async_added_to_hass()
+        self._async_set_coordinator(self.coordinator)
+        self.async_on_remove(self._async_remove_coordinator_listener)
+        data: DweloData = self.hass.data[DOMAIN][self.platform.config_entry.entry_id]
+        data.entities[self.entity_id] = self
+        self.async_on_remove(partial(data.entities.pop, self.entity_id, None))
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_UPDATED.format(self._metadata.uid),
+                self._async_metadata_updated,
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_REMOVED.format(self._metadata.uid),
+                self._async_device_removed,
+            )
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the API is reachable and the gateway is healthy."""
+        return (
+            super().available
+            and self.coordinator.client.available
+            and self.coordinator.gateway_available
+        )
+
+    def _handles_device(self, metadata: DweloDeviceMetadata) -> bool:
+        """Return True if the entity still applies to the device."""
+        return True
+
+    def _update_metadata(self, metadata: DweloDeviceMetadata) -> None:
+        """Apply changed device metadata to the entity attributes."""
+        self._attr_name = metadata.given_name
+
+    def _availability_changed(self) -> bool:
+        """Return True if the availability differs from the last written state."""
+        return self.available != self._written_available
+
+    @callback
+    def _async_write_state(self) -> None:
+        """Write the state and remember the availability it was written with."""
+        self._written_available = self.available
+        self.async_write_ha_state()
+
+    @callback
+    def _async_set_coordinator(self, coordinator: DweloGatewayCoordinator) -> None:
+        """Listen to the coordinator of the device's current gateway."""
+        self._async_remove_coordinator_listener()
+        self.coordinator = coordinator
+        self._remove_coordinator_listener = coordinator.async_add_listener(
+            self._handle_coordinator_update, self.coordinator_context
+        )
+
+    @callback
+    def _async_remove_coordinator_listener(self) -> None:
+        """Stop listening to the coordinator."""
+        if self._remove_coordinator_listener is not None:
+            self._remove_coordinator_listener()
+            self._remove_coordinator_listener = None
+
+    @callback
+    def _async_metadata_updated(
+        self, metadata: DweloDeviceMetadata, coordinator: DweloGatewayCoordinator
+    ) -> None:
+        """Handle changed device metadata, including a move to another gateway."""
+        if not self._handles_device(metadata):
+            self._async_device_removed()
+            return
+        self._metadata = metadata
+        self._update_metadata(metadata)
+        if coordinator is not self.coordinator:
+            self._async_set_coordinator(coordinator)
+            self._handle_coordinator_update()
+        self._async_write_state()
+
+    @callback
+    def _async_device_removed(self) -> None:
+        """Remove the entity of a device that is gone or changed type."""
+        if self.registry_entry is not None:
+            # Removing the registry entry removes the entity as well.
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove(force_remove=True))
+
+
+class DweloSensorEntityBase(DweloEntity):
+    """An entity showing one extra sensor of a device from the gateway poll.
+
+    entity_description.key is the Dwelo sensorType and its value_fn converts
+    the raw value. The state is only written when the converted value or the
+    availability changes, and subclasses can further ignore changes that are
+    too small to be worth recording.
+    """
+
+    entity_description: EntityDescription
+
+    def __init__(
+        self,
+        coordinator: DweloGatewayCoordinator,
+        metadata: DweloDeviceMetadata,
+        description: EntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, metadata)
+        self.entity_description = description
+        self._attr_unique_id = f"{description.key}_{metadata.uid}"
+        self._attr_name = f"{metadata.given_name} {description.name}"
+        self._value: any = None
+        self._update_value()
+
+    @property
+    def available(self) -> bool:
+        """Return if the gateway reported a usable value."""
+        return super().available and self._value is not None
+
+    def _handles_device(self, metadata: DweloDeviceMetadata) -> bool:
+        """Return True while the device's converter does not use the sensor."""
+        return is_extra_sensor(metadata.device_type, self.entity_description.key)
+
+    def _update_metadata(self, metadata: DweloDeviceMetadata) -> None:
+        """Apply changed device metadata to the sensor."""
+        self._attr_name = f"{metadata.given_name} {self.entity_description.name}"
+
+    def _update_value(self) -> bool:
+        """Read the sensor from the latest poll, returning True if it changed."""
+        value = None
+        snapshot = self.coordinator.data
+        if snapshot is not None and (
+            sensor := snapshot.sensor_index.get(self._metadata.uid, {}).get(
+                self.entity_description.key
+            )
+        ):
+            try:
+                value = self.entity_description.value_fn(sensor["value"])
+            except (KeyError, TypeError, ValueError):
+                value = None
+        if value == self._value or not self._is_meaningful_change(value):
+            return False
+        self._value = value
+        return True
+
+    def _is_meaningful_change(self, value: any) -> bool:
+        """Return if a new value differs enough from the current one to write."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the sensor from the latest gateway poll."""
+        if self._update_value() or self._availability_changed():
+            self._async_write_state()
+
+
+@callback
+def async_add_sensor_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    descriptions: Mapping[str, EntityDescription],
+    entity_factory: Callable[
+        [DweloGatewayCoordinator, DweloDeviceMetadata, EntityDescription], Entity
+    ],
+) -> None:
+    """Add entities for extra sensors as they show up in gateway polls.
+
+    descriptions maps the Dwelo sensorTypes to show to their descriptions;
+    adding a sensorType there is all it takes to show it for every device that
+    reports it. Each gateway is checked when its data changes, so sensors of devices that
+    only report after setup, or that discovery adds later, get entities too.
+    Added sensors are tracked by device rather than by gateway, as their
+    entities follow a device that moves to another gateway.
+    """
+    data: DweloData = hass.data[DOMAIN][entry.entry_id]
+    tracked: set[DweloGatewayCoordinator] = set()
+    added: set[tuple[str, str]] = set()
+
+    @callback
+    def _async_add_gateway_sensors(coordinator: DweloGatewayCoordinator) -> None:
+        snapshot = coordinator.data
+        if snapshot is None:
+            return
+        # Forget sensors whose entities removed themselves, so they get new
+        # entities if they come back.
+        added.intersection_update(
+            (uid, sensor_type)
+            for uid, sensor_type in added
+            if (metadata := data.device_metadata.get(uid)) is not None
+            and is_extra_sensor(metadata.device_type, sensor_type)
+        )
+
+        entities = []
+        for uid, sensors in snapshot.sensor_index.items():
+            if (metadata := coordinator.device_metadata.get(uid)) is None:
+                continue
+            for sensor_type in sensors.keys() & descriptions.keys():
+                if (uid, sensor_type) in added or not is_extra_sensor(
+                    metadata.device_type, sensor_type
+                ):
+                    continue
+                added.add((uid, sensor_type))
+                entities.append(
+                    entity_factory(coordinator, metadata, descriptions[sensor_type])
+                )
+        if entities:
+            async_add_entities(entities)
+
+    @callback
+    def _async_track_coordinators(*_args: any) -> None:
+        tracked.intersection_update(data.coordinators.values())
+        for coordinator in data.coordinators.values():
+            if coordinator in tracked:
+                continue
+            tracked.add(coordinator)
+            entry.async_on_unload(
+                coordinator.async_add_listener(
+                    partial(_async_add_gateway_sensors, coordinator)
+                )
+            )
+            _async_add_gateway_sensors(coordinator)
+
+    _async_track_coordinators()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_track_coordinators
+        )
+    )
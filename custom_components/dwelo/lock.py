@@ -1,16 +1,20 @@
 """A module for Dwelo lock devices."""
 
-from datetime import timedelta
 import logging
 
 from homeassistant.components.lock import LockEntity, LockEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .commands import DweloCommandTracker
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
+from .coordinator import DweloGatewayCoordinator
 from .dwelo_devices.dwelo_lock import DweloLockDevice
-from .models import DweloLockState
+from .entity import DweloEntity
+from .models import DweloData, DweloDeviceMetadata, DweloDeviceType, DweloLockState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,8 +24,6 @@ DWELO_LOCK_STATE_TO_HA_STATE = {
 }
 HA_STATE_TO_DWELO_LOCK_STATE = {v: k for k, v in DWELO_LOCK_STATE_TO_HA_STATE.items()}
 
-SCAN_INTERVAL = timedelta(seconds=30)
-
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -29,70 +31,163 @@ async def async_setup_entry(
     """Set up the Dwelo lock platform."""
 
     data: DweloData = hass.data[DOMAIN][entry.entry_id]
-    entities = []
-
-    for metadata in data.device_metadata.values():
-        if metadata.device_type == "lock":
-            device = await DweloLockDevice.from_metadata(data.client, metadata)
-            if device and device.data:  # Ensure device is valid
-                entities.append(DweloLockEntity(device))
-            else:
-                _LOGGER.error(f"Failed to initialize lock device: {metadata}")
-
-    async_add_entities(entities)
-
 
-class DweloLockEntity(LockEntity):
+    @callback
+    def _async_add_locks(device_metadata: list[DweloDeviceMetadata]) -> None:
+        """Add an entity for every lock in the given devices."""
+        entities = []
+        failed = []
+
+        for metadata in device_metadata:
+            if metadata.device_type == "lock":
+                coordinator = data.coordinators[metadata.gateway_id]
+                device = DweloLockDevice.from_snapshot(
+                    data.client, metadata, coordinator.data
+                )
+                if coordinator.data and metadata.uid in coordinator.data.errors:
+                    failed.append(metadata.uid)
+                entities.append(
+                    DweloLockEntity(coordinator, device, data.command_tracker)
+                )
+
+        if failed:
+            _LOGGER.warning(
+                f"{len(failed)} locks have no usable data and start unavailable: {failed}"  # noqa: G004
+            )
+
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_locks(list(data.device_metadata.values()))
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_locks
+        )
+    )
+
+
+class DweloLockEntity(DweloEntity, LockEntity):
     """Representation of a Dwelo lock entity within Home Assistant."""
 
     def __init__(
         self,
+        coordinator: DweloGatewayCoordinator,
         device: DweloLockDevice,
+        command_tracker: DweloCommandTracker,
     ) -> None:
         """Initialize the lock."""
-        super().__init__()
+        super().__init__(coordinator, device.metadata)
         self._device = device
+        self._command_tracker = command_tracker
+        # The state of the last command, until the gateway reports it.
+        self._pending_state: DweloLockState | None = None
 
         self._attr_unique_id = f"lock_{self._device.metadata.uid}"
         self._attr_name = self._device.metadata.given_name
         self._attr_supported_features = LockEntityFeature(0)  # No additional features like open
-        self._attr_is_locked = self._device.data.state == DweloLockState.LOCKED
-        self._attr_extra_state_attributes = {
-            "battery_level": self._device.data.battery_level,
-            "is_online": self._device.data.is_online,
-        }
+        self._attr_is_locked = None
+        self._update_from_device()
         _LOGGER.debug(f"Initialized lock entity: {self._device.metadata}")
 
-    async def async_update(self) -> None:
-        """Update the lock data from the Dwelo API."""
-        await self._device.async_update()
-        if self._device.data:
+    def _update_from_device(self) -> None:
+        """Copy the current device data onto the entity attributes."""
+        if not self._device.data:
+            return
+        if self._pending_state is None:
             self._attr_is_locked = self._device.data.state == DweloLockState.LOCKED
-            self._attr_extra_state_attributes = {
-                "battery_level": self._device.data.battery_level,
-                "is_online": self._device.data.is_online,
-            }
+
+    def _handles_device(self, metadata: DweloDeviceMetadata) -> bool:
+        """Return True while the device is a lock."""
+        return metadata.device_type == DweloDeviceType.LOCK.value
+
+    def _update_metadata(self, metadata: DweloDeviceMetadata) -> None:
+        """Apply changed device metadata to the lock."""
+        super()._update_metadata(metadata)
+        self._device.metadata = metadata
+
+    def _resolve_pending_command(self) -> bool:
+        """Resolve the pending command if the gateway reports its state."""
+        if self._pending_state is None or not self._device.data:
+            return False
+        if self._device.data.state != self._pending_state:
+            return False
+        self._pending_state = None
+        self._command_tracker.async_resolve(self._device.metadata.uid)
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the lock data from the latest gateway poll.
+
+        Nothing is written to the state machine unless the lock's own sensor
+        values or its availability changed.
+        """
+        changed = self._device.update_from_snapshot(self.coordinator.data)
+        resolved = self._resolve_pending_command()
+        if not (changed or resolved or self._availability_changed()):
+            return
+
+        if self._device.data:
+            self._update_from_device()
             _LOGGER.debug(f"Updated lock data: {self._device.data}")
         else:
             _LOGGER.error(f"Failed to update lock data for {self._device.metadata.uid}")
+        self._async_write_state()
+
+    @property
+    def available(self) -> bool:
+        """Return if the lock has data and its gateway is reachable."""
+        return super().available and self._device.data is not None
 
     @property
     def is_locked(self) -> bool:
         """Return true if the lock is locked."""
         return self._attr_is_locked
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop tracking any pending command."""
+        await super().async_will_remove_from_hass()
+        self._command_tracker.async_resolve(self._device.metadata.uid)
+
     async def async_lock(self, **kwargs) -> None:
         """Lock the device."""
         _LOGGER.info(f"Locking device {self._device.metadata.given_name}")
-        await self._device.set_lock_state(self._device.metadata, DweloLockState.LOCKED)
-        self._attr_is_locked = True
-        self.async_write_ha_state()
-        await self.async_update()
+        await self._async_set_lock_state(DweloLockState.LOCKED)
 
     async def async_unlock(self, **kwargs) -> None:
         """Unlock the device."""
         _LOGGER.info(f"Unlocking device {self._device.metadata.given_name}")
-        await self._device.set_lock_state(self._device.metadata, DweloLockState.UNLOCKED)
-        self._attr_is_locked = False
-        self.async_write_ha_state()
-        await self.async_update()
\ No newline at end of file
+        await self._async_set_lock_state(DweloLockState.UNLOCKED)
+
+    async def _async_set_lock_state(self, state: DweloLockState) -> None:
+        """Send a lock command and show its state until the gateway confirms it."""
+        if not await self._device.set_lock_state(self._device.metadata, state):
+            raise HomeAssistantError(
+                f"Failed to set {self._device.metadata.given_name} to {state.value}"
+            )
+
+        self._pending_state = state
+        if self._resolve_pending_command():
+            # The gateway already reports this state, e.g. locking a locked
+            # lock. Identical gateway data does not reach the entity, so no
+            # later poll would confirm the command.
+            self._update_from_device()
+            self._async_write_state()
+            return
+
+        self._attr_is_locked = state == DweloLockState.LOCKED
+        self._async_write_state()
+        self._command_tracker.async_track(
+            self.coordinator,
+            self._device.metadata.uid,
+            state.value,
+            self._handle_command_timeout,
+        )
+
+    @callback
+    def _handle_command_timeout(self) -> None:
+        """Fall back to the reported state when a command never shows up."""
+        self._pending_state = None
+        if self._device.data:
+            self._attr_is_locked = self._device.data.state == DweloLockState.LOCKED
+        self._async_write_state()
@@ -1,6 +1,6 @@
 """Dwelo data models."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 
@@ -26,6 +26,7 @@ class DweloThermostatState(Enum):
     COOL = "cool"
     IDLE = "idle"
 
+
 class DweloLockState(Enum):
     """Dwelo lock states."""
 
@@ -33,7 +34,7 @@ class DweloLockState(Enum):
     UNLOCKED = "unlocked"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DweloDeviceMetadata:
     """A dwelo device."""
 
@@ -53,9 +54,13 @@ class DweloData:
     entry_id: str
     client: any
     device_metadata: dict[str, DweloDeviceMetadata]
+    coordinators: dict[str, any] = field(default_factory=dict)
+    command_tracker: any = None
+    # Entities that are added to Home Assistant, by entity ID.
+    entities: dict[str, any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DweloThermostatData:
     """Dwelo thermostat data."""
 
@@ -63,13 +68,63 @@ class DweloThermostatData:
     mode: DweloThermostatMode
     target_temperature_cool: float
     target_temperature_heat: float
-    state: str
+    state: DweloThermostatState
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DweloLockData:
     """Dwelo lock data."""
 
     state: DweloLockState
-    battery_level: int
-    is_online: bool
\ No newline at end of file
+
+
+@dataclass(frozen=True, slots=True)
+class DweloGatewaySnapshot:
+    """The converted state of every device on a gateway after one poll.
+
+    sensor_index holds the raw sensors by device ID and sensor type, states the
+    typed device data by device ID, values the sensor values each state was
+    converted from, and errors the devices whose sensors could not be converted.
+    """
+
+    sensor_index: dict[str, dict[str, any]]
+    states: dict[str, DweloThermostatData | DweloLockData]
+    values: dict[str, tuple]
+    errors: dict[str, str]
+
+
+@dataclass
+class DweloSharedData:
+    """Data shared by every Dwelo config entry."""
+
+    rate_limiter: any
+    poll_stagger: any
+
+
+@dataclass(frozen=True, slots=True)
+class DweloToken:
+    """A Dwelo bearer token and what we know about its lifetime.
+
+    issued_at is a Unix timestamp. lifetime is how long the previous token
+    lasted before the API rejected it, in seconds, or None if no token has
+    been seen expiring yet.
+    """
+
+    token: str
+    issued_at: float
+    lifetime: float | None = None
+
+
+@dataclass
+class DweloClientMetrics:
+    """Counters describing the traffic of a Dwelo client."""
+
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    deadlines_exceeded: int = 0
+    circuit_rejections: int = 0
+    relogins: int = 0
+    coalesced_requests: int = 0
+    cache_hits: int = 0
@@ -0,0 +1,197 @@
+"""Poll scheduling for Dwelo gateways."""
+
+from collections.abc import Callable
+from datetime import timedelta
+import time
+
+FAST_POLL_INTERVAL = timedelta(seconds=2)
+FAST_POLL_WINDOW = timedelta(seconds=60)
+MAX_IDLE_POLL_INTERVAL = timedelta(minutes=5)
+IDLE_POLLS_BEFORE_BACKOFF = 10
+FAILURES_BEFORE_PROBING = 3
+PROBE_INTERVAL = timedelta(minutes=1)
+MAX_PROBE_INTERVAL = timedelta(minutes=30)
+
+
+class AdaptivePollInterval:
+    """Pick how long to wait before polling a gateway again.
+
+    Right after a command the gateway is polled on a short backoff starting at
+    fast_interval and doubling up to the base interval, until the command
+    settles or fast_window passes. Once the gateway has reported the same data
+    idle_polls times in a row, the interval doubles on every further unchanged
+    poll up to max_interval. Any change resets it to base.
+    """
+
+    def __init__(
+        self,
+        base_interval: timedelta,
+        fast_interval: timedelta = FAST_POLL_INTERVAL,
+        fast_window: timedelta = FAST_POLL_WINDOW,
+        max_interval: timedelta = MAX_IDLE_POLL_INTERVAL,
+        idle_polls: int = IDLE_POLLS_BEFORE_BACKOFF,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a poll interval for a gateway."""
+        self._base_interval = base_interval
+        self._fast_interval = min(fast_interval, base_interval)
+        self._fast_window = fast_window.total_seconds()
+        self._max_interval = max(max_interval, base_interval)
+        self._idle_polls = idle_polls
+        self._clock = clock
+        self._fast_until = 0.0
+        self._fast_polls = 0
+        self._unchanged_polls = 0
+
+    @property
+    def base_interval(self) -> timedelta:
+        """Get the interval used while the gateway is neither busy nor idle."""
+        return self._base_interval
+
+    @property
+    def next_interval(self) -> timedelta:
+        """Get the interval until the next poll."""
+        if self._clock() < self._fast_until:
+            return min(
+                self._fast_interval * 2**self._fast_polls, self._base_interval
+            )
+        idle_polls = self._unchanged_polls - self._idle_polls
+        if idle_polls < 0:
+            return self._base_interval
+        return min(self._base_interval * 2 ** (idle_polls + 1), self._max_interval)
+
+    @property
+    def boosted(self) -> bool:
+        """Return True while polling quickly after a command."""
+        return self._clock() < self._fast_until
+
+    @property
+    def first_fast_interval(self) -> timedelta:
+        """Get the delay before the first poll after a boost."""
+        return self._fast_interval
+
+    def boost(self) -> None:
+        """Poll quickly for a while, e.g. after sending a command."""
+        self._fast_until = self._clock() + self._fast_window
+        self._fast_polls = 0
+        self._unchanged_polls = 0
+
+    def settle(self) -> None:
+        """Stop polling quickly, e.g. once a command has been confirmed."""
+        self._fast_until = 0.0
+
+    def record_poll(self, changed: bool) -> None:
+        """Record whether the latest poll returned new data."""
+        self._unchanged_polls = 0 if changed else self._unchanged_polls + 1
+        if self._clock() < self._fast_until:
+            self._fast_polls += 1
+
+
+class GatewayHealth:
+    """Tracks whether a gateway is worth polling at its normal cadence.
+
+    A gateway turns unhealthy after failures_before_probing failed polls in a
+    row, or while every device on it is reported offline. Unhealthy gateways
+    are only probed, starting at probe_interval and doubling up to
+    max_probe_interval. A successful poll or probe makes the gateway healthy
+    again, whether it was failing or offline; discovery marks it offline again
+    if its devices still are.
+    """
+
+    def __init__(
+        self,
+        failures_before_probing: int = FAILURES_BEFORE_PROBING,
+        probe_interval: timedelta = PROBE_INTERVAL,
+        max_probe_interval: timedelta = MAX_PROBE_INTERVAL,
+    ) -> None:
+        """Create the health of a gateway."""
+        self._failures_before_probing = failures_before_probing
+        self._probe_interval = probe_interval
+        self._max_probe_interval = max(max_probe_interval, probe_interval)
+        self._failures = 0
+        self._offline = False
+        self._probes = 0
+
+    @property
+    def healthy(self) -> bool:
+        """Return True if the gateway should be polled normally."""
+        return not self._offline and self._failures < self._failures_before_probing
+
+    @property
+    def offline(self) -> bool:
+        """Return True if discovery found every device offline after the last poll."""
+        return self._offline
+
+    @property
+    def probe_interval(self) -> timedelta:
+        """Get the delay until the next probe of an unhealthy gateway."""
+        doublings = min(max(self._probes - 1, 0), 16)
+        return min(self._probe_interval * 2**doublings, self._max_probe_interval)
+
+    def set_offline(self, offline: bool) -> None:
+        """Record whether every device on the gateway is reported offline."""
+        self._offline = offline
+        if self.healthy:
+            self._probes = 0
+
+    def record_poll(self, success: bool) -> None:
+        """Record the result of a poll or probe."""
+        self._failures = 0 if success else self._failures + 1
+        if success:
+            self._offline = False
+        self._probes = 0 if self.healthy else self._probes + 1
+
+
+def _van_der_corput(index: int) -> float:
+    """Get the index-th element of the base 2 van der Corput sequence."""
+    phase, denominator = 0.0, 1
+    while index:
+        denominator *= 2
+        index, bit = divmod(index, 2)
+        phase += bit / denominator
+    return phase
+
+
+class PollStagger:
+    """Spreads the polls of all gateways evenly over their poll interval.
+
+    Every poller gets a phase, a fraction of the interval. Phases come from
+    the van der Corput sequence (0, 1/2, 1/4, 3/4, ...), so they stay evenly
+    spread as pollers come and go. Each poll is then moved to the nearest
+    point of its own grid, instead of every gateway firing on the same tick.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Create a poll stagger."""
+        self._clock = clock
+        self._indexes: dict[object, int] = {}
+
+    def register(self, poller: object) -> None:
+        """Give a poller the first free phase."""
+        if poller in self._indexes:
+            return
+        taken = set(self._indexes.values())
+        self._indexes[poller] = next(
+            index for index in range(len(taken) + 1) if index not in taken
+        )
+
+    def unregister(self, poller: object) -> None:
+        """Free the phase of a poller."""
+        self._indexes.pop(poller, None)
+
+    def delay(self, poller: object, interval: timedelta) -> timedelta:
+        """Get the delay that puts the next poll on the poller's grid.
+
+        The result is between half and one and a half times interval.
+        """
+        index = self._indexes.get(poller)
+        period = interval.total_seconds()
+        if index is None or period <= 0:
+            return interval
+
+        now = self._clock()
+        offset = _van_der_corput(index) * period
+        poll_at = round((now + period - offset) / period) * period + offset
+        if poll_at - now < period / 2:
+            poll_at += period
+        return timedelta(seconds=poll_at - now)
@@ -0,0 +1,158 @@
+"""Retry and circuit breaker policies for the Dwelo API transport."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from http import HTTPStatus
+import logging
+import random
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statuses that usually clear up on their own and are worth retrying.
+RETRYABLE_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header into a number of seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed request."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def backoff(self, retry: int, retry_after: float | None = None) -> float:
+        """Get the delay before the given retry (0 for the first retry).
+
+        Uses capped exponential backoff with full jitter, unless the server
+        told us how long to wait.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+@dataclass
+class RequestTimeouts:
+    """Per-request timeouts in seconds for each kind of Dwelo API call.
+
+    poll_cycle is the overall budget for polling a gateway, including retries.
+    """
+
+    poll: float = 10.0
+    command: float = 20.0
+    discovery: float = 30.0
+    login: float = 15.0
+    poll_cycle: float = 25.0
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling the Dwelo API while it is failing.
+
+    After failure_threshold consecutive failed requests the circuit opens and
+    requests fail fast. Once reset_timeout has passed a single probe request is
+    let through; if it succeeds the circuit closes again, otherwise it reopens.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a circuit breaker."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the current state of the circuit."""
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._reset_timeout
+        ):
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Return False while requests are being rejected."""
+        return self.state is not CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """Check if a request may be sent, claiming the probe slot if half open."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.OPEN or self._probe_in_flight:
+            return False
+
+        _LOGGER.info("Dwelo API circuit is half open, sending a probe request")
+        self._state = CircuitState.HALF_OPEN
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """Give up a claimed probe slot without recording a result."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """Record a request that reached a healthy API."""
+        if self._state is not CircuitState.CLOSED:
+            _LOGGER.info("Dwelo API recovered, closing circuit")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the API is unhealthy."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if (
+            self._state is CircuitState.HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            if self._state is CircuitState.CLOSED:
+                _LOGGER.warning(
+                    f"Dwelo API failed {self._failures} times in a row, opening circuit for {self._reset_timeout}s"  # noqa: G004
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
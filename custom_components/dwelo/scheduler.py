@@ -0,0 +1,177 @@
+"""Priority scheduling of Dwelo API requests."""
+
+import asyncio
+from collections.abc import Callable
+from enum import IntEnum
+import heapq
+import itertools
+import time
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Requests per second and burst size allowed across all Dwelo accounts.
+DEFAULT_RATE_LIMIT = 3.0
+DEFAULT_RATE_LIMIT_BURST = 10
+
+
+class RequestPriority(IntEnum):
+    """Priority classes of Dwelo API requests, lowest value first."""
+
+    COMMAND = 0
+    DISCOVERY = 1
+    POLL = 2
+
+
+class DweloRequestScheduler:
+    """Orders Dwelo API requests by priority.
+
+    At most max_concurrency requests are in flight at once, and requests for
+    the same gateway are sent one at a time. A waiting request holds nothing:
+    whenever a request finishes, the most urgent waiters whose gateway is idle
+    get the free slots, device commands before discovery before gateway polls.
+    A command therefore waits for at most the request in flight on its gateway,
+    never behind the polls queued for it.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        """Create a request scheduler."""
+        self._capacity = max(1, max_concurrency)
+        self._in_flight = 0
+        self._busy_gateways: set[str] = set()
+        self._waiters: list[tuple[int, int, str | None, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Get the number of requests waiting for their turn."""
+        return sum(not waiter[3].done() for waiter in self._waiters)
+
+    async def acquire(
+        self, priority: RequestPriority, gateway_id: str | None = None
+    ) -> None:
+        """Wait for a turn to send a request."""
+        if self._can_start(gateway_id):
+            # Nobody who is waiting could use this turn, or they would have it.
+            self._start(gateway_id)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (priority, next(self._sequence), gateway_id, future)
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The turn was handed over just before the cancellation.
+                self.release(gateway_id)
+            raise
+
+    def release(self, gateway_id: str | None = None) -> None:
+        """End a turn and hand out the turns it frees up."""
+        self._in_flight -= 1
+        self._busy_gateways.discard(gateway_id)
+        waiting = []
+        for waiter in sorted(self._waiters):
+            _, _, waiter_gateway, future = waiter
+            if future.done():
+                continue
+            if self._can_start(waiter_gateway):
+                self._start(waiter_gateway)
+                future.set_result(None)
+            else:
+                waiting.append(waiter)
+        # A sorted list is a valid heap.
+        self._waiters = waiting
+
+    def _can_start(self, gateway_id: str | None) -> bool:
+        """Return True if a request for the gateway could be sent right now."""
+        return self._in_flight < self._capacity and (
+            gateway_id is None or gateway_id not in self._busy_gateways
+        )
+
+    def _start(self, gateway_id: str | None) -> None:
+        """Count a request as in flight."""
+        self._in_flight += 1
+        if gateway_id is not None:
+            self._busy_gateways.add(gateway_id)
+
+
+class TokenBucket:
+    """Limits the rate of Dwelo API requests.
+
+    The bucket holds up to burst tokens and refills at rate tokens per second;
+    every request takes one. Callers that find it empty wait for a token by
+    priority, like the scheduler's waiters, so a command never waits behind
+    the polls of every account sharing the bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_RATE_LIMIT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a full token bucket."""
+        self._rate = rate
+        self._capacity = float(max(1, burst))
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: int = RequestPriority.POLL) -> None:
+        """Wait for a token."""
+        self._refill()
+        if self._tokens >= 1 and not self._has_waiters():
+            self._tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._schedule_wakeup()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was handed over just before the cancellation.
+                self._tokens += 1
+                self._hand_out()
+            raise
+
+    def _refill(self) -> None:
+        """Add the tokens that accrued since the last refill."""
+        now = self._clock()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _has_waiters(self) -> bool:
+        """Return True if a caller is still waiting, dropping cancelled ones."""
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        return bool(self._waiters)
+
+    def _hand_out(self) -> None:
+        """Give the available tokens to the most urgent waiters."""
+        self._refill()
+        while self._tokens >= 1 and self._has_waiters():
+            _, _, future = heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """Wake up when the next token is due, if anyone is waiting for it."""
+        if self._timer is not None or not self._has_waiters():
+            return
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wakeup)
+
+    def _wakeup(self) -> None:
+        """Hand out the tokens that accrued while callers were waiting."""
+        self._timer = None
+        self._hand_out()
@@ -0,0 +1,113 @@
+"""A module for Dwelo sensors."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTemperature
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import CONF_BATTERY_DEADBAND, DEFAULT_BATTERY_DEADBAND
+from .coordinator import DweloGatewayCoordinator
+from .entity import DweloSensorEntityBase, async_add_sensor_entities
+from .models import DweloDeviceMetadata
+
+
+@dataclass(frozen=True, kw_only=True)
+class DweloSensorEntityDescription(SensorEntityDescription):
+    """Describes a Dwelo sensor; key is the Dwelo sensorType."""
+
+    value_fn: Callable[[any], StateType] = float
+    # Ignore changes smaller than the configured deadband, so slowly drifting
+    # values do not write a state on every small step.
+    apply_deadband: bool = False
+
+
+# Sensor types shown as sensors.
+SENSOR_DESCRIPTIONS: dict[str, DweloSensorEntityDescription] = {
+    description.key: description
+    for description in (
+        DweloSensorEntityDescription(
+            key="temperature",
+            name="Temperature",
+            device_class=SensorDeviceClass.TEMPERATURE,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        ),
+        DweloSensorEntityDescription(
+            key="humidity",
+            name="Humidity",
+            device_class=SensorDeviceClass.HUMIDITY,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=PERCENTAGE,
+        ),
+        DweloSensorEntityDescription(
+            key="battery",
+            name="Battery",
+            device_class=SensorDeviceClass.BATTERY,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=PERCENTAGE,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            value_fn=int,
+            apply_deadband=True,
+        ),
+    )
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the Dwelo sensor platform."""
+    deadband = entry.options.get(CONF_BATTERY_DEADBAND, DEFAULT_BATTERY_DEADBAND)
+    async_add_sensor_entities(
+        hass,
+        entry,
+        async_add_entities,
+        SENSOR_DESCRIPTIONS,
+        partial(DweloSensorEntity, deadband=deadband),
+    )
+
+
+class DweloSensorEntity(DweloSensorEntityBase, SensorEntity):
+    """A sensor of a Dwelo device."""
+
+    entity_description: DweloSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: DweloGatewayCoordinator,
+        metadata: DweloDeviceMetadata,
+        description: DweloSensorEntityDescription,
+        deadband: float = 0,
+    ) -> None:
+        """Initialize the sensor."""
+        self._deadband = deadband
+        super().__init__(coordinator, metadata, description)
+
+    def _is_meaningful_change(self, value: StateType) -> bool:
+        """Return if the value moved by at least the deadband.
+
+        Changes from or to no value always count.
+        """
+        if (
+            not self.entity_description.apply_deadband
+            or value is None
+            or self._value is None
+        ):
+            return True
+        return abs(value - self._value) >= self._deadband
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the converted sensor value."""
+        return self._value
@@ -0,0 +1,231 @@
+"""Services that send one command to many Dwelo devices."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import partial
+import logging
+
+from aiohttp import ClientError
+import voluptuous as vol
+
+from homeassistant.components.climate import ATTR_HVAC_MODE, HVACMode
+from homeassistant.const import ATTR_TEMPERATURE, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .const import (
+    DOMAIN,
+    SERVICE_BULK_LOCK,
+    SERVICE_BULK_SET_TEMPERATURE,
+    SERVICE_BULK_UNLOCK,
+)
+from .dwelo_client import DweloAuthError
+from .models import (
+    DweloData,
+    DweloDeviceMetadata,
+    DweloDeviceType,
+    DweloLockState,
+    DweloThermostatMode,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Commands of one bulk service call that are in flight at once.
+BULK_COMMAND_CONCURRENCY = 4
+
+BULK_LOCK_SCHEMA = cv.make_entity_service_schema({})
+BULK_SET_TEMPERATURE_SCHEMA = cv.make_entity_service_schema(
+    {
+        vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+        vol.Optional(ATTR_HVAC_MODE): vol.In([HVACMode.HEAT, HVACMode.COOL]),
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BulkTarget:
+    """A Dwelo device targeted by a bulk service call."""
+
+    entity_id: str
+    data: DweloData
+    metadata: DweloDeviceMetadata
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the bulk services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_LOCK,
+        partial(_async_bulk_lock, hass, DweloLockState.LOCKED),
+        schema=BULK_LOCK_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_UNLOCK,
+        partial(_async_bulk_lock, hass, DweloLockState.UNLOCKED),
+        schema=BULK_LOCK_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET_TEMPERATURE,
+        partial(_async_bulk_set_temperature, hass),
+        schema=BULK_SET_TEMPERATURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_bulk_lock(
+    hass: HomeAssistant, state: DweloLockState, call: ServiceCall
+) -> ServiceResponse:
+    """Lock or unlock every targeted lock."""
+    targets = _async_resolve_targets(hass, call, Platform.LOCK, DweloDeviceType.LOCK)
+    return await _async_run_bulk(targets, partial(_async_set_lock, state))
+
+
+async def _async_bulk_set_temperature(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Set the target temperature of every targeted thermostat."""
+    targets = _async_resolve_targets(
+        hass, call, Platform.CLIMATE, DweloDeviceType.THERMOSTAT
+    )
+    mode = None
+    if (hvac_mode := call.data.get(ATTR_HVAC_MODE)) is not None:
+        mode = DweloThermostatMode(hvac_mode)
+    return await _async_run_bulk(
+        targets,
+        partial(_async_set_temperature, call.data[ATTR_TEMPERATURE], mode),
+    )
+
+
+@callback
+def _async_resolve_targets(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    platform: Platform,
+    device_type: DweloDeviceType,
+) -> list[BulkTarget]:
+    """Find the Dwelo devices behind the entities and areas of a call.
+
+    Entities of other integrations or platforms, e.g. everything else in a
+    targeted area, are skipped.
+    """
+    selected = async_extract_referenced_entity_ids(hass, call)
+    registry = er.async_get(hass)
+    domain_data = hass.data.get(DOMAIN, {})
+
+    targets = []
+    for entity_id in sorted(selected.referenced | selected.indirectly_referenced):
+        entry = registry.async_get(entity_id)
+        if entry is None or entry.platform != DOMAIN or entry.domain != platform:
+            continue
+        data: DweloData | None = domain_data.get(entry.config_entry_id)
+        if data is None:
+            continue
+        uid = entry.unique_id.removeprefix(f"{device_type.value}_")
+        metadata = data.device_metadata.get(uid)
+        if metadata is None or metadata.device_type != device_type.value:
+            continue
+        targets.append(BulkTarget(entity_id=entity_id, data=data, metadata=metadata))
+
+    if not targets:
+        raise ServiceValidationError(f"No Dwelo {platform} entities were targeted")
+    return targets
+
+
+async def _async_run_bulk(
+    targets: list[BulkTarget],
+    command: Callable[[BulkTarget], Awaitable[None]],
+) -> ServiceResponse:
+    """Send a command to every target and summarize the results.
+
+    At most BULK_COMMAND_CONCURRENCY commands are in flight, and a failing
+    device does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(BULK_COMMAND_CONCURRENCY)
+
+    async def _async_send(target: BulkTarget) -> str | None:
+        async with semaphore:
+            try:
+                await command(target)
+            except (ClientError, TimeoutError, DweloAuthError) as err:
+                return f"Unable to reach the Dwelo API: {err}"
+            except HomeAssistantError as err:
+                return str(err)
+        return None
+
+    errors = await asyncio.gather(*(_async_send(target) for target in targets))
+
+    results = {}
+    for target, error in zip(targets, errors, strict=True):
+        results[target.entity_id] = {
+            "device_id": target.metadata.uid,
+            "success": error is None,
+        }
+        if error is not None:
+            results[target.entity_id]["error"] = error
+
+    if failed := sum(error is not None for error in errors):
+        _LOGGER.warning(
+            f"Dwelo bulk command failed for {failed} of {len(targets)} devices"  # noqa: G004
+        )
+    return {"succeeded": len(targets) - failed, "failed": failed, "results": results}
+
+
+def _get_entity(target: BulkTarget) -> any:
+    """Get the entity of a target, which sends its commands."""
+    if (entity := target.data.entities.get(target.entity_id)) is None:
+        raise HomeAssistantError(f"{target.entity_id} is not loaded")
+    return entity
+
+
+async def _async_set_lock(state: DweloLockState, target: BulkTarget) -> None:
+    """Lock or unlock one device through its entity.
+
+    The entity shows the requested state and tracks the command until the
+    gateway confirms it, like for a single lock command.
+    """
+    entity = _get_entity(target)
+    if state == DweloLockState.LOCKED:
+        await entity.async_lock()
+    else:
+        await entity.async_unlock()
+
+
+async def _async_set_temperature(
+    temperature: float, mode: DweloThermostatMode | None, target: BulkTarget
+) -> None:
+    """Set the target temperature of one thermostat through its entity.
+
+    Without a mode the setpoint of the thermostat's current mode is set. The
+    command goes through the entity's command queue, so it is debounced with
+    other changes to the thermostat and tracked until the gateway confirms it.
+    """
+    metadata = target.metadata
+    current = None
+    coordinator = target.data.coordinators.get(metadata.gateway_id)
+    if coordinator is not None and coordinator.data is not None:
+        if (thermostat := coordinator.data.states.get(metadata.uid)) is not None:
+            current = thermostat.mode
+    if mode is None:
+        mode = current
+    if mode not in (DweloThermostatMode.HEAT, DweloThermostatMode.COOL):
+        raise HomeAssistantError(f"{metadata.given_name} is not heating or cooling")
+
+    await _get_entity(target).async_set_temperature(
+        **{ATTR_TEMPERATURE: temperature, ATTR_HVAC_MODE: HVACMode(mode.value)}
+    )
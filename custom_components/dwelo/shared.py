@@ -0,0 +1,23 @@
+"""State shared by every Dwelo config entry."""
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SHARED, DOMAIN
+from .models import DweloSharedData
+from .polling import PollStagger
+from .scheduler import TokenBucket
+
+
+@callback
+def async_get_shared_data(hass: HomeAssistant) -> DweloSharedData:
+    """Get the rate limiter and poll stagger shared by all Dwelo accounts.
+
+    Several accounts talk to the same API, so they share one request budget
+    and one poll schedule.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (shared := domain_data.get(DATA_SHARED)) is None:
+        shared = domain_data[DATA_SHARED] = DweloSharedData(
+            rate_limiter=TokenBucket(), poll_stagger=PollStagger()
+        )
+    return shared
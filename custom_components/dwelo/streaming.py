@@ -0,0 +1,259 @@
+"""Incremental parsing of large Dwelo list responses."""
+
+from collections.abc import Callable, Iterable
+import json
+from typing import Any
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# Most text held for an element that is still being read.
+DEFAULT_MAX_BUFFER = 1024 * 1024
+
+
+class IncompleteJson(Exception):
+    """Raised internally when more data is needed to continue parsing."""
+
+
+class ResultsStreamParser:
+    """Parse a JSON object whose array member is read item by item.
+
+    Dwelo list endpoints answer with an object like
+    {"count": 2, "next": null, "results": [...]}. Text is fed in as it arrives;
+    every complete item of the array is passed through keep and fields right
+    away, so only the kept, projected items and the item currently being read
+    are ever held in memory. Other top-level members are kept in members.
+
+    Malformed JSON raises ValueError as soon as it is read, and so does an
+    element that grows beyond max_buffer characters.
+    """
+
+    def __init__(
+        self,
+        array_key: str = "results",
+        keep: Callable[[dict], bool] | None = None,
+        fields: Iterable[str] | None = None,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+    ) -> None:
+        """Create a parser."""
+        self._array_key = array_key
+        self._keep = keep
+        self._fields = tuple(fields) if fields is not None else None
+        self._max_buffer = max_buffer
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: str | None = None
+        # How far the value starting at _scan_start has been scanned, so every
+        # character of an element that spans many chunks is only looked at once.
+        self._scan_start = -1
+        self._scan_pos = 0
+        self._scan_depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.members: dict[str, Any] = {}
+        self.items: list[Any] = []
+
+    @property
+    def done(self) -> bool:
+        """Return True once the whole object has been read."""
+        return self._state == "done"
+
+    def feed(self, text: str) -> None:
+        """Feed the next piece of the document."""
+        self._scan_start -= self._pos
+        self._scan_pos -= self._pos
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        try:
+            while self._state != "done":
+                self._step()
+        except IncompleteJson:
+            if len(self._buffer) - self._pos > self._max_buffer:
+                raise ValueError(
+                    f"JSON element is larger than {self._max_buffer} characters"
+                ) from None
+
+    def result(self) -> dict[str, Any]:
+        """Get the parsed object, with only the kept items in the array."""
+        if not self.done:
+            raise ValueError("Incomplete JSON document")
+        return {**self.members, self._array_key: self.items}
+
+    def _step(self) -> None:
+        """Consume the next token for the current state.
+
+        Right after "{" or "[" the container may close at once. After a comma
+        a value has to follow, and after a value a comma or the closing
+        character, so empty elements and trailing commas raise ValueError.
+        """
+        char = self._next_char()
+        if self._state == "start":
+            if char != "{":
+                raise ValueError(f"Expected a JSON object, got {char!r}")
+            self._pos += 1
+            self._state = "member"
+        elif self._state in ("member", "member_value"):
+            if self._state == "member" and char == "}":
+                self._pos += 1
+                self._state = "done"
+            else:
+                self._expect_value(char)
+                self._read_key()
+        elif self._state == "member_data":
+            self._expect_value(char)
+            self._read_member_data()
+        elif self._state == "member_next":
+            if char == ",":
+                self._pos += 1
+                self._state = "member_value"
+            elif char == "}":
+                self._pos += 1
+                self._state = "done"
+            else:
+                raise ValueError(f"Expected ',' or '}}', got {char!r}")
+        elif self._state in ("item", "item_value"):
+            if self._state == "item" and char == "]":
+                self._pos += 1
+                self._state = "member_next"
+            else:
+                self._expect_value(char)
+                self._read_item()
+        elif self._state == "item_next":
+            if char == ",":
+                self._pos += 1
+                self._state = "item_value"
+            elif char == "]":
+                self._pos += 1
+                self._state = "member_next"
+            else:
+                raise ValueError(f"Expected ',' or ']', got {char!r}")
+
+    @staticmethod
+    def _expect_value(char: str) -> None:
+        """Raise ValueError if an element is missing where one is needed."""
+        if char in ",]}":
+            raise ValueError(f"Expected a value, got {char!r}")
+
+    def _read_key(self) -> None:
+        """Read the key of a top-level member and the colon after it."""
+        start = self._pos
+        try:
+            key = self._decode()
+            if self._next_char() != ":":
+                raise ValueError("Expected ':' after object key")
+        except IncompleteJson:
+            # Re-read the key once more data arrives.
+            self._pos = start
+            raise
+        self._pos += 1
+        self._key = key
+        self._state = "member_data"
+
+    def _read_member_data(self) -> None:
+        """Read the value of a member, entering the array if it is the one."""
+        if self._key == self._array_key:
+            if self._next_char() != "[":
+                raise ValueError(f"Expected {self._array_key} to be an array")
+            self._pos += 1
+            self._state = "item"
+            return
+        self.members[self._key] = self._decode()
+        self._state = "member_next"
+
+    def _read_item(self) -> None:
+        """Read one array item and keep it if wanted."""
+        item = self._decode()
+        self._state = "item_next"
+        if self._keep is not None and not self._keep(item):
+            return
+        if self._fields is not None and isinstance(item, dict):
+            item = {field: item[field] for field in self._fields if field in item}
+        self.items.append(item)
+
+    def _decode(self) -> Any:
+        """Decode the value at the current position.
+
+        The value is only decoded once it is known to be complete, so a decode
+        error always means malformed JSON.
+        """
+        start = self._pos
+        self._next_char()
+        start_value = self._pos
+        try:
+            self._scan_value(start_value)
+            value, end = _DECODER.raw_decode(self._buffer, start_value)
+        except IncompleteJson:
+            self._pos = start
+            raise
+        except json.JSONDecodeError as err:
+            raise ValueError(f"Malformed JSON: {err}") from err
+        self._pos = end
+        return value
+
+    def _scan_value(self, start: int) -> None:
+        """Check that the value at start is complete, without decoding it.
+
+        A number or literal is only complete once something follows it,
+        as one cut off by the end of the buffer looks complete as well.
+        """
+        buffer = self._buffer
+        if self._scan_start != start:
+            self._scan_start = start
+            self._scan_pos = start
+            self._scan_depth = 0
+            self._in_string = False
+            self._escaped = False
+        pos = self._scan_pos
+        depth = self._scan_depth
+        in_string = self._in_string
+        escaped = self._escaped
+        scalar = buffer[start] not in '{["'
+        end = -1
+        while pos < len(buffer):
+            char = buffer[pos]
+            pos += 1
+            if scalar:
+                if char in _WHITESPACE or char in ",]}:":
+                    end = pos - 1
+                    break
+            elif in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 0:
+                        end = pos
+                        break
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = pos
+                    break
+        self._scan_pos = pos
+        self._scan_depth = depth
+        self._in_string = in_string
+        self._escaped = escaped
+        if end < 0:
+            raise IncompleteJson
+        self._scan_start = -1
+        self._pos = end
+        # Whatever follows a complete value must be available to check it.
+        self._next_char()
+
+    def _next_char(self) -> str:
+        """Skip whitespace and peek at the next character."""
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        if pos >= len(buffer):
+            raise IncompleteJson
+        return buffer[pos]